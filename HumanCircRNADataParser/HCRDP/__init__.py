@@ -1 +1 @@
-from HCRDP import hcrdp
\ No newline at end of file
+from . import hcrdp 
\ No newline at end of file
@@ -1,7 +1,11 @@
-import pybedtools
 import csv
 import sys
 import os 
+import bisect
+import json
+import threading
+#the optional arguments throughout this module are checked against null
+null = None
 class DataParser:
 	''' This is the main class of the tool.  From here, you can call various methods that work to convert and analyze genomic data files:
 		User can choose to dump all info into this class call and call each function in this order: exonToIntron(), intronExtender(), then MainParser() or call each individually with different arguments
@@ -11,7 +15,15 @@ class DataParser:
 		When calling intronExtender: 1 file is saved: extended_intron_file.bed
 		When calling mainParser: 39 files are saved: extended_lifted_mouse_circRNA_file.bed hcf_elmcf.bed, hcf_elmcf_same_start.bed, hcf_elmcf_same_end.bed, hcf_elmcfss_sine.bed, hcf_elmcfse_sine.bed, hcf_elmcfsss_unextended.bed, hcf_elmcfses_unextended.bed, hesu_nodups.bed, heeu_nodups.bed, hcb_sine.bed, hcbs_nodups.bed, hcbs_reextended.bed, hc_extended.bed, mc_same.bed, mc_same_sine.bed, mcss_nodups.bed, forced_liftover_mcss.bed, flm_start_extended.bed, flm_end_extended.bed, fse_b1b2.bed, fee_b1b2.bed, fseb_unextended.bed, feeb_unextended.bed, mcb_both.bed, mcbb_nodups.bed, introns_mcbb.bed, imcbb_unextended.bed, forced_liftover_mcf_human.bed, humanCircRNAfinalextended.bed, hcf_normal.bed, hcfn_nodups.bed, hcrpm.bed, hcrpm_nodups.bed, cofmv.bed, comhvp.bed, comparison_of_mouse_human_final.bed, cofmvv_use.bed, narrow_list_human_mouse.bed, nlhm_final.bed   
 		(it might be a good idea to set up a separate empty directory prior to caling these methods to contain these files)
+		mainParser writes each file under a temporary name and renames it once complete, and records the completed steps in mainParser_journal.json so an interrupted call can be picked up again with resume=True.
+		When the same human files are compared with several genomes of interest, humanBundle() saves the human side of mainParser once and mainParser(human_bundle=...) reuses it.
+		When hcf, mcf or mclf gain entries, incrementalParser() brings the four files of interest of mainParser up to date by computing again only the circRNAs affected.
+		mainParser returns a ConservationResults holding the pairs of nlhm_final.bed indexed by name and region, for looking them up one at a time or in batches.
+		To answer conservation and flank questions about single circRNAs without a mainParser run, call buildIndex() for an in-memory ConservationIndex, or serve() to answer them over localhost HTTP or a Unix socket.
 		The parameters hcf, mcf, mclf, hrsinef, and mrb1b2f, must be defined to use this code.
+		Any of them may also be a Parquet (.parquet) or Arrow IPC (.arrow) file holding the bed columns in order, which needs pyarrow.
+		exonToIntron, intronExtender and mainParser save their files gzip or bgzip compressed under the same names when called with compress='gzip' or compress='bgzip', and compressed bed files are read as they are wherever this module reads bed files.
+		To run several genomes or parameter sets in one process, list them in a JSON job file and run hcrdp.py with it, see main().
 		If you want to look at another genome, you must call the class again to redefine elements from the new genome.
 		The other parameters here can be defined later or redefined in calls to the functions, and the function definition of the parameters take priority.
 		This is made to work with Python v2.7.12.
@@ -74,6 +86,7 @@ class DataParser:
 			
 			
 		
+		self.extend_sine = extend_sine
 		if self.extend_sine == null:
 			self.extend_sine = 2000
 			
@@ -101,12 +114,21 @@ class DataParser:
 			
 			
 			
-	def exonToIntron(self, ef2):
+	def exonToIntron(self, ef2, collapse=False, compress=None, progress=None, progress_interval=10):
 		'''Converts an exon file to an intron file 
 		
 		:param ef2: string of the bed file containing information on the exons of the genome of interest (default self.ef)
 		:type ef: string
+		:param collapse: if True, write each distinct intron once with the names of all of the transcripts sharing it joined by commas in the name column, so intronExtender() and the intron step of mainParser() only handle each coordinate once; expandIntrons() gives back one row per transcript (default False)
+		:type collapse: bool
+		:param compress: Optional 'gzip' or 'bgzip' to save intron_file.bed compressed, see mainParser() (default None, plain text)
+		:type compress: string
+		:param progress: True to report the rows read, the bytes read and written and the time left every progress_interval seconds on standard error, or the name of a JSON status file to rewrite with them, see mainParser() (default None, no reports)
+		:type progress: bool or string
+		:param progress_interval: the seconds between progress reports (default 10)
+		:type progress_interval: float
 		'''
+		ef = self.ef
 		if ef2 != null:
 			ef = ef2
 			
@@ -116,11 +138,17 @@ class DataParser:
 			return
 			
 			
-		c1 = list()
-		with open(ef) as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					c1.append(word)
+		if progress:
+			def run():
+				_PROGRESS.start('intron_file.bed', [ef], 'intron_file.bed')
+				_counting('intron_file.bed')
+				try:
+					self.exonToIntron(ef, collapse, compress)
+				finally:
+					_COUNTING.counter = null
+				_PROGRESS.finish('intron_file.bed')
+			return _reporting('exonToIntron', ['intron_file.bed'], progress, progress_interval, run)
+		c1 = _readWords(ef)
 		names = c1[0::12]
 		chroms = c1[1::12]
 		starts = c1[8::12]
@@ -163,23 +191,50 @@ class DataParser:
 			for y in x:
 				ends3.append(y)
 
-		f = open('intron_file.bed', 'w')		
+		f = _openOutput('intron_file.bed', compress)
 		k = 0
+		transcripts = dict()
+		introns = list()
 	#ends come before starts because the ends of the exon are the beginnings of the introns and the starts of the exons are the ends of the introns
 		for i in range(len(names)):
 			for j in range(len(starts3[i])):
-				print >> f, chroms[i] + "\t" + ends3[k] + "\t" + starts4[k] + "\t" + names[i]
+				if collapse:
+					intron = (chroms[i], ends3[k], starts4[k])
+					if intron not in transcripts:
+						transcripts[intron] = list()
+						introns.append(intron)
+					transcripts[intron].append(names[i])
+				else:
+					print >> f, chroms[i] + "\t" + ends3[k] + "\t" + starts4[k] + "\t" + names[i]
 				k = k + 1
 
+	#collapsed introns are written in the order they are first seen
+		for intron in introns:
+			print >> f, intron[0] + "\t" + intron[1] + "\t" + intron[2] + "\t" + ",".join(transcripts[intron])
 		f.close()
 		print "The file containing the introns based on the exon file you submitted are saved under intron_file.bed in the current directory"
-	def intronExtender(self, inf2):
+	def expandIntrons(self, inf2=None, outfile='expanded_intron_file.bed'):
+		''' Expands an intron file written with exonToIntron(collapse=True), or any file derived from one such as imcbb_unextended.bed, back to one row per intron per transcript
+		
+		:param inf2: string of the collapsed intron file (default "imcbb_unextended.bed", the flanking introns saved by mainParser())
+		:type inf2: string
+		:param outfile: string of the file to write (default "expanded_intron_file.bed")
+		:type outfile: string
+		'''
+		inf = "imcbb_unextended.bed"
+		if inf2 != null:
+			inf = inf2
+		_expandNames(outfile, inf)
+		print "The introns of " + inf + " are saved one row per transcript under " + outfile
+	def intronExtender(self, inf2, compress=None):
 		''' This extends the intron coordinates by 10 nt in both directions 
 		
 			:param inf2: Optional string parameter that represents an intron file that the user may want to extend separately (default "intron_file.bed", the file produced at the end of the last exonToIntron() call
 			:type inf: string
+			:param compress: Optional 'gzip' or 'bgzip' to save extended_intron_file.bed compressed, see mainParser() (default None, plain text)
+			:type compress: string
 		'''
-		
+		inf = null
 		if inf2 != null:
 			inf = inf2
 			
@@ -192,11 +247,8 @@ class DataParser:
 			return
 			
 			
-		c1 = list()
-		with open(inf) as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					c1.append(word)
+		extend_intron = self.extend_intron
+		c1 = _readWords(inf)
 		chroms = c1[0::4]
 		starts = c1[1::4]
 		ends = c1[2::4]
@@ -211,12 +263,12 @@ class DataParser:
 			one_end = int(x)
 			one_end = one_end + extend_intron
 			ends2.append(one_end)
-		f = open('extended_intron_file.bed', 'w')
+		f = _openOutput('extended_intron_file.bed', compress)
 		for i in range(len(chroms)):
 			print >> f, chroms[i] + "\t" + repr(starts2[i]) + "\t" + repr(ends2[i]) + "\t" + names[i]
 
 		f.close()
-	def mainParser(self, feiom, fextend_sine, fextend_circRNA, fextend_intron, fcomp_distance_buffer_high, fcomp_distance_buffer_low):
+	def mainParser(self, feiom, fextend_sine, fextend_circRNA, fextend_intron, fcomp_distance_buffer_high, fcomp_distance_buffer_low, sqlite=None, columnar=None, resume=False, banded_join=False, workers=1, prefetch=False, memory_limit=None, compress=None, compress_threads=4, progress=None, progress_interval=10, human_bundle=None):
 		'''The main function with the purpose of analyzing, comparing, and producing files with respect to the genome of interest's relation to the human genome.
 		
 		:param feiom: a string representing the file containing the extended introns of the genome of interest(default eiom as definedby the class) (default2 "extended_intron_file.bed")
@@ -231,8 +283,34 @@ class DataParser:
 		:type fcomp_distance_buffer_high: int
 		:param fcomp_distance_buffer_low: the lower limit for the number of nuleotides apart the start and end coordinates of a circRNA in a given genome must be from the start and end coordinates of the other genome in order to be considered corresponding circRNAs, used in creating the nlhm_final file (default -50)
 		:type fcomp_distance_buffer_low: int
+		:param sqlite: Optional string naming a SQLite database that every file saved by this call is also written into, see writeSQLite() (default None)
+		:type sqlite: string
+		:param columnar: Optional string, 'parquet' or 'arrow', to also write every file saved by this call in that columnar format, see writeColumnar() (default None)
+		:type columnar: string
+		:param resume: if True, skip the steps that the journal of an earlier interrupted call in this directory (mainParser_journal.json) shows complete with the same inputs and parameters, and pick up at the first step that is not (default False)
+		:type resume: bool
+		:param banded_join: if True, build narrow_list_human_mouse.bed with one banded join of forced_liftover_mcf_human.bed against hcf on the start and end differences, instead of filtering cofmvv_use.bed row by row (cofmvv_use.bed is then not saved) (default False)
+		:type banded_join: bool
+		:param workers: the number of steps that may run at the same time; steps that do not depend on each other's files, such as the start side and end side repeat intersects, then run in parallel (default 1, one step after another)
+		:type workers: int
+		:param prefetch: if True, start reading all of the input files at once when the call begins, see prefetch(), so the first steps do not wait on each file in turn.  With more than one worker or a memory_limit the files are only read through into the page cache, not held parsed. (default False)
+		:type prefetch: bool
+		:param memory_limit: Optional memory budget, in bytes or as a string such as '4G', shared by the steps running at the same time.  A step whose input would not fit reads it a row at a time instead of whole, the forced liftovers join in partitions spilled to compressed temporary files, and sort keeps its buffer within the budget.  The files saved are the same. (default None, no budget)
+		:type memory_limit: int or string
+		:param compress: Optional 'gzip' or 'bgzip' to save every file of this call compressed under its usual name.  The text is compressed in 1MB pieces by compress_threads threads while the steps go on producing rows; gzip writes each piece as a gzip member and bgzip as the 64KB BGZF blocks that tabix and samtools index.  Either reads back with gzip -dc, and the steps of mainParser and the other methods of this module read the compressed files as they are. (default None, plain text)
+		:type compress: string
+		:param compress_threads: the number of threads compressing each file being written (default 4)
+		:type compress_threads: int
+		:param progress: True to report on standard error every progress_interval seconds the steps done, the rows read, rows per second, bytes read and bytes written of each step running, and the time left estimated from the sizes of the files the steps read; or the name of a JSON status file to rewrite with the same figures for every step, for a scheduler to poll.  A last report gives the state, done or failed, once the call ends. (default None, no reports)
+		:type progress: bool or string
+		:param progress_interval: the seconds between progress reports (default 10)
+		:type progress_interval: float
+		:param human_bundle: Optional directory of human bundles, see humanBundle().  hc_extended.bed and the human circRNAs flanked by SINEs are then taken from the bundle for hcf, hrsinef, extend_sine and extend_circRNA, built there first if there is none yet, and hesu_nodups.bed and heeu_nodups.bed are picked out of hcf_elmcf.bed with them.  The six files from hcf_elmcf_same_start.bed to hcf_elmcfses_unextended.bed are then not saved, and the others are the same. (default None, compute them in this call)
+		:type human_bundle: string
+		:returns: ConservationResults over the files saved, for looking up the pairs of nlhm_final.bed by name or region
 	
 		'''
+		eiom = null
 		if feiom != null:
 			eiom = feiom
 		
@@ -245,896 +323,3094 @@ class DataParser:
 			print "Must define extended_intron_file.bed in either class or function call, or run a successful intronExtender"
 			return
 
+		extend_sine = self.extend_sine
 		if fextend_sine != null:
 			extend_sine = fextend_sine
 		
 		
+		extend_circRNA = self.extend_circRNA
 		if fextend_circRNA != null:
 			extend_circRNA = fextend_circRNA
 			
 			
+		extend_intron = self.extend_intron
 		if fextend_intron != null:
 			extend_intron = fextend_intron
 			
 			
+		comp_distance_buffer_high = self.comp_distance_buffer_high
 		if fcomp_distance_buffer_high != null:
 			comp_distance_buffer_high = fcomp_distance_buffer_high
 			
 			
+		comp_distance_buffer_low = self.comp_distance_buffer_low
 		if fcomp_distance_buffer_low != null:
 			comp_distance_buffer_low = fcomp_distance_buffer_low
 			
-		database = list()
-		with open(mclf) as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-		chroms = database[0::12]
-		starts = database[1::12]
-		ends = database[2::12]
-		names = database[3::12]
-		datab1 = database[4::12]
-		datab2 = database[5::12]
-		datab3 = database[6::12]
-		datab4 = database[7::12]
-		datab5 = database[8::12]
-		datab6 = database[9::12]
-		datab7 = database[10::12]
-		datab8 = database[11::12]
-		starts2 = list()
-		ends2 = list()
-		for x in starts:
-			one_start = int(x)
-			one_start = one_start - extend_amount
-			starts2.append(one_start)
-
-
-		for x in ends:
-			one_end = int(x)
-			one_end = one_end + extend_amount
-			ends2.append(one_end)
-
-
-		f = open('extended_lifted_mouse_circRNA_file.bed', 'w')
-		for i in range(len(chroms)):
-			print >> f, chroms[i] + "\t" + repr(starts2[i]) + "\t" + repr(ends2[i]) + "\t" + names[i] + "\t" + datab1[i] + "\t" + datab2[i] + "\t" + datab3[i] + "\t" + datab4[i] + "\t" + datab5[i] + "\t" + datab6[i] + "\t" + datab7[i] + "\t" + datab8[i]
-
-
-		f.close()
-
-		#now it's ready to intersect
-		hc = pybedtools.BedTool(hcf)
-		mcl = pybedtools.BedTool('extended_lifted_mouse_circRNA_file.bed')
-		f = open('hcf_elmcf.bed', 'w')
-		print >> f, hc.intersect(mcl, wa=True)
-		f.close()
-		#have to extend each side one at a time
-		#code to extend hc_samev2.bed by 2000 on start side
-		database = list()
-		with open('hcf_elmcf.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-
-		chroms = database[0::12]
-		starts = database[1::12]
-		ends = database[2::12]
-		names = database[3::12]
-		datab1 = database[4::12]
-		datab2 = database[5::12]
-		datab3 = database[6::12]
-		datab4 = database[7::12]
-		datab5 = database[8::12]
-		datab6 = database[9::12]
-		datab7 = database[10::12]
-		datab8 = database[11::12]
-		starts2 = list()
-		for x in starts:
-			one_start = int(x)
-			one_start = one_start - extend_sine
-			starts2.append(one_start)
-
-
-		f = open('hcf_elmcf_same_start.bed', 'w')
-		for i in range(len(chroms)):
-			print >> f, chroms[i] + "\t" + repr(starts2[i]) + "\t" + ends[i] + "\t" + names[i] + "\t" + datab1[i] + "\t" + datab2[i] + "\t" + datab3[i] + "\t" + datab4[i] + "\t" + datab5[i] + "\t" + datab6[i] + "\t" + datab7[i] + "\t" + datab8[i]
-
-
-		f.close()
-		#Now do the end side
-		database = list()
-		with open('hcf_elmcf.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-
-		chroms = database[0::12]
-		starts = database[1::12]
-		ends = database[2::12]
-		names = database[3::12]
-		datab1 = database[4::12]
-		datab2 = database[5::12]
-		datab3 = database[6::12]
-		datab4 = database[7::12]
-		datab5 = database[8::12]
-		datab6 = database[9::12]
-		datab7 = database[10::12]
-		datab8 = database[11::12]
-		ends2 = list()
-		for x in ends:
-			one_end = int(x)
-			one_end = one_end + extend_sine
-			ends2.append(one_end)
-
-
-		f = open('hcf_elmcf_same_end.bed', 'w')
-		for i in range(len(chroms)):
-			print >> f, chroms[i] + "\t" + starts[i] + "\t" + repr(ends2[i]) + "\t" + names[i] + "\t" + datab1[i] + "\t" + datab2[i] + "\t" + datab3[i] + "\t" + datab4[i] + "\t" + datab5[i] + "\t" + datab6[i] + "\t" + datab7[i] + "\t" + datab8[i]
-
-
-		f.close()
-		#intersect to get files for both sides
-		hcse = pybedtools.BedTool('hcf_elmcf_same_start.bed')
-		hrsine = pybedtools.BedTool(hrsinef)
-		f = open('hcf_elmcfss_sine.bed', 'w')
-		print >> f, hcse.intersect(hrsine, wa=True)
-		f.close()
-		#intersect #2
-		hcse = pybedtools.BedTool('hcf_elmcf_same_end.bed')
-		hrsine = pybedtools.BedTool(hrsinef)
-		f = open('hcf_elmcfse_sine.bed', 'w')
-		print >> f, hcse.intersect(hrsine, wa=True)
-		f.close()
-		#unextend each file 
-		database = list()
-		with open('hcf_elmcfss_sine.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-
-		chroms = database[0::12]
-		starts = database[1::12]
-		ends = database[2::12]
-		names = database[3::12]
-		datab1 = database[4::12]
-		datab2 = database[5::12]
-		datab3 = database[6::12]
-		datab4 = database[7::12]
-		datab5 = database[8::12]
-		datab6 = database[9::12]
-		datab7 = database[10::12]
-		datab8 = database[11::12]
-		starts2 = list()
-		for x in starts:
-			one_start = int(x)
-			one_start = one_start + extend_sine
-			starts2.append(one_start)
-
-
-		f = open('hcf_elmcfsss_unextended.bed', 'w')
-		for i in range(len(chroms)):
-			print >> f, chroms[i] + "\t" + repr(starts2[i]) + "\t" + ends[i] + "\t" + names[i] + "\t" + datab1[i] + "\t" + datab2[i] + "\t" + datab3[i] + "\t" + datab4[i] + "\t" + datab5[i] + "\t" + datab6[i] + "\t" + datab7[i] + "\t" + datab8[i]
-
-
-		f.close()
-		#unextend the ends
-		database = list()
-		with open('hcf_elmcfse_sine.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-
-		chroms = database[0::12]
-		starts = database[1::12]
-		ends = database[2::12]
-		names = database[3::12]
-		datab1 = database[4::12]
-		datab2 = database[5::12]
-		datab3 = database[6::12]
-		datab4 = database[7::12]
-		datab5 = database[8::12]
-		datab6 = database[9::12]
-		datab7 = database[10::12]
-		datab8 = database[11::12]
-		ends2 = list()
-		for x in ends:
-			one_end = int(x)
-			one_end = one_end - extend_sine
-			ends2.append(one_end)
-
-		f = open('hcf_elmcfses_unextended.bed', 'w')
-		for i in range(len(chroms)):
-			print >> f, chroms[i] + "\t" + starts[i] + "\t" + repr(ends2[i]) + "\t" + names[i] + "\t" + datab1[i] + "\t" + datab2[i] + "\t" + datab3[i] + "\t" + datab4[i] + "\t" + datab5[i] + "\t" + datab6[i] + "\t" + datab7[i] + "\t" + datab8[i]
-
-
-		f.close()
-		#duplicates
-		os.system("cat 'hcf_elmcfsss_unextended.bed' | sort | uniq > hesu_nodups.bed")
-		os.system("cat 'hcf_elmcfses_unextended.bed' | sort | uniq > heeu_nodups.bed")
-		#now have to intersect the two files to get a listof introns that have both requirements
-		hs = pybedtools.BedTool('hesu_nodups.bed')
-		he = pybedtools.BedTool('heeu_nodups.bed')
-		f = open('hcb_sine.bed', 'w')
-		print >> f, hs.intersect(he, wa=True)
-		f.close()
-		#delete duplicates
-		os.system("cat 'hcb_sine.bed' | sort | uniq > hcbs_nodups.bed")
-		#must be reextended by 50 on both sides
-		database = list()
-		with open('hcbs_nodups.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-		chroms = database[0::12]
-		starts = database[1::12]
-		ends = database[2::12]
-		names = database[3::12]
-		datab1 = database[4::12]
-		datab2 = database[5::12]
-		datab3 = database[6::12]
-		datab4 = database[7::12]
-		datab5 = database[8::12]
-		datab6 = database[9::12]
-		datab7 = database[10::12]
-		datab8 = database[11::12]
-		starts2 = list()
-		ends2 = list()
-		for x in starts:
-			one_start = int(x)
-			one_start = one_start - extend_circRNA
-			starts2.append(one_start)
-
-
-		for x in ends:
-			one_end = int(x)
-			one_end = one_end + extend_circRNA
-			ends2.append(one_end)
-
-
-		f = open('hcbs_reextended.bed', 'w')
-		for i in range(len(chroms)):
-			print >> f, chroms[i] + "\t" + repr(starts2[i]) + "\t" + repr(ends2[i]) + "\t" + names[i] + "\t" + datab1[i] + "\t" + datab2[i] + "\t" + datab3[i] + "\t" + datab4[i] + "\t" + datab5[i] + "\t" + datab6[i] + "\t" + datab7[i] + "\t" + datab8[i]
-
-
-		f.close()
-		#have to remake mc_samev3
-		database = list()
-		with open(hcf) as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-		chroms = database[0::12]
-		starts = database[1::12]
-		ends = database[2::12]
-		names = database[3::12]
-		datab1 = database[4::12]
-		datab2 = database[5::12]
-		datab3 = database[6::12]
-		datab4 = database[7::12]
-		datab5 = database[8::12]
-		datab6 = database[9::12]
-		datab7 = database[10::12]
-		datab8 = database[11::12]
-		starts2 = list()
-		ends2 = list()
-		for x in starts:
-			one_start = x
-			if one_start !='chromStart':
-				one_start = int(x)
-				one_start = one_start - extend_circRNA
-			starts2.append(one_start)
-
-
-		for x in ends:
-			one_end = x
-			if one_end != 'chromEnd':
-				one_end = int(x)
-				one_end = one_end + extend_circRNA
-			ends2.append(one_end)
-
-
-
-		f = open('hc_extended.bed', 'w')
-		for i in range(len(chroms)):
-			print >> f, chroms[i] + "\t" + repr(starts2[i]) + "\t" + repr(ends2[i]) + "\t" + names[i] + "\t" + datab1[i] + "\t" + datab2[i] + "\t" + datab3[i] + "\t" + datab4[i] + "\t" + datab5[i] + "\t" + datab6[i] + "\t" + datab7[i] + "\t" + datab8[i]
-
-
-		f.close()
-		mcsl = pybedtools.BedTool(mclf)
-		hcsr = pybedtools.BedTool('hc_extended.bed')
-		f = open('mc_same.bed', 'w')
-		print >> f, mcsl.intersect(hcsr, wa=True)
-		f.close()
-		#now mc_samev3(lifted) can be intersected with hcs_reextended with mcsl.intersect(hcsr, wa=True)
-		mcsl = pybedtools.BedTool('mc_same.bed')
-		hcsr = pybedtools.BedTool('hcbs_reextended.bed')
-		f = open('mc_same_sine.bed', 'w')
-		print >> f, mcsl.intersect(hcsr, wa=True)
-		f.close()
-		#duplicates remove
-		os.system("cat 'mc_same_sine.bed' | sort | uniq > mcss_nodups.bed")
-		#force liftover of mc_same
-		data = list()
-		with open('mcss_nodups.bed') as tsv:
-			 for line in csv.reader(tsv, dialect="excel-tab"):
-					 for word in line:
-							 data.append(word)
-
-		 
-		chroms = data[0::12]
-		starts = data[1::12]
-		ends = data[2::12]
-		names = data[3::12]
-		data1 = data[4::12]
-		data2 = data[5::12]
-		data3 = data[6::12]
-		data4 = data[7::12]
-		data5 = data[8::12]
-		data6 = data[9::12]
-		data7 = data[10::12]
-		data8 = data[11::12]
-		database = list()
-		with open(mcf) as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-		chroms2 = database[0::12]
-		starts2 = database[1::12]
-		ends2 = database[2::12]
-		names2 = database[3::12]
-		datab1 = database[4::12]
-		datab2 = database[5::12]
-		datab3 = database[6::12]
-		datab4 = database[7::12]
-		datab5 = database[8::12]
-		datab6 = database[9::12]
-		datab7 = database[10::12]
-		datab8 = database[11::12]
-
-		f = open('forced_liftover_mcss.bed', 'w')
-
-		for i in range(len(chroms)):
-			for j in range(len(chroms2)):
-				if names2[j] == names[i]:
-					print >> f, chroms2[j] + "\t" + starts2[j] + "\t" + ends2[j] + "\t" + names2[j] + "\t" + datab1[j] + "\t" + datab2[j] + "\t" + datab3[j] + "\t" +  datab4[j] + "\t" + datab5[j] + "\t" + datab6[j] + "\t" + datab7[j] + "\t" + datab8[j]
-
-
-		f.close()
-
-		#forced_liftover_mcss.bed now is all of the mousecircRNA with the same coords as humancircRNA that have sines within 2000 nt that are in the coords of mouse genome
-		#all that's left now is to use the mouseB1 and B2 file to determine which of these circRNAs have B1 or B2 within 2000 nt
-		# start with an extension of 2000 nt in both directions of the current mcss bed file
-		database = list()
-		with open('forced_liftover_mcss.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-
-		chroms = database[0::12]
-		starts = database[1::12]
-		ends = database[2::12]
-		names = database[3::12]
-		datab1 = database[4::12]
-		datab2 = database[5::12]
-		datab3 = database[6::12]
-		datab4 = database[7::12]
-		datab5 = database[8::12]
-		datab6 = database[9::12]
-		datab7 = database[10::12]
-		datab8 = database[11::12]
-		starts2 = list()
-
-		for x in starts:
-			one_start = int(x)
-			one_start = one_start - extend_sine
-			starts2.append(one_start)
-
-		f = open('flm_start_extended.bed', 'w')
-		for i in range(len(chroms)):
-			print >> f, chroms[i] + "\t" + repr(starts2[i]) + "\t" + ends[i] + "\t" + names[i] + "\t" + datab1[i] + "\t" + datab2[i] + "\t" + datab3[i] + "\t" + datab4[i] + "\t" + datab5[i] + "\t" + datab6[i] + "\t" + datab7[i] + "\t" + datab8[i]
-
-		f.close()
-
-		#ENDS
-		database = list()
-		with open('forced_liftover_mcss.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-
-		chroms = database[0::12]
-		starts = database[1::12]
-		ends = database[2::12]
-		names = database[3::12]
-		datab1 = database[4::12]
-		datab2 = database[5::12]
-		datab3 = database[6::12]
-		datab4 = database[7::12]
-		datab5 = database[8::12]
-		datab6 = database[9::12]
-		datab7 = database[10::12]
-		datab8 = database[11::12]
-		ends2 = list()
-		for x in ends:
-			one_end = int(x)
-			one_end = one_end + extend_sine
-			ends2.append(one_end)
-
-		f = open('flm_end_extended.bed', 'w')
-		for i in range(len(chroms)):
-			print >> f, chroms[i] + "\t" + starts[i] + "\t" + repr(ends2[i]) + "\t" + names[i] + "\t" + datab1[i] + "\t" + datab2[i] + "\t" + datab3[i] + "\t" + datab4[i] + "\t" + datab5[i] + "\t" + datab6[i] + "\t" + datab7[i] + "\t" + datab8[i]
-
-
-		f.close()
-		#intersect each with B1B2
-		fse = pybedtools.BedTool('flm_start_extended.bed')
-		mrb1b2 = pybedtools.BedTool(mrb1b2f)
-		f = open('fse_b1b2.bed', 'w')
-		print >> f, fse.intersect(mrb1b2, wa=True)
-		f.close()
-		#ends
-		fee = pybedtools.BedTool('flm_end_extended.bed')
-		mrb1b2 = pybedtools.BedTool(mrb1b2f)
-		f = open('fee_b1b2.bed', 'w')
-		print >> f, fee.intersect(mrb1b2, wa=True)
-		f.close()
-		#unextend the two
-		database = list()
-		with open('fse_b1b2.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-
-		chroms = database[0::12]
-		starts = database[1::12]
-		ends = database[2::12]
-		names = database[3::12]
-		datab1 = database[4::12]
-		datab2 = database[5::12]
-		datab3 = database[6::12]
-		datab4 = database[7::12]
-		datab5 = database[8::12]
-		datab6 = database[9::12]
-		datab7 = database[10::12]
-		datab8 = database[11::12]
-		starts2 = list()
-
-		for x in starts:
-			one_start = int(x)
-			one_start = one_start + extend_sine
-			starts2.append(one_start)
-
-		f = open('fseb_unextended.bed', 'w')
-		for i in range(len(chroms)):
-			print >> f, chroms[i] + "\t" + repr(starts2[i]) + "\t" + ends[i] + "\t" + names[i] + "\t" + datab1[i] + "\t" + datab2[i] + "\t" + datab3[i] + "\t" + datab4[i] + "\t" + datab5[i] + "\t" + datab6[i] + "\t" + datab7[i] + "\t" + datab8[i]
-
-
-		f.close()
-		#ends
-		database = list()
-		with open('fee_b1b2.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-
-		chroms = database[0::12]
-		starts = database[1::12]
-		ends = database[2::12]
-		names = database[3::12]
-		datab1 = database[4::12]
-		datab2 = database[5::12]
-		datab3 = database[6::12]
-		datab4 = database[7::12]
-		datab5 = database[8::12]
-		datab6 = database[9::12]
-		datab7 = database[10::12]
-		datab8 = database[11::12]
-		ends2 = list()
-
-		for x in ends:
-			one_end = int(x)
-			one_end = one_end - extend_sine
-			ends2.append(one_end)
-
-		f = open('feeb_unextended.bed', 'w')
-		for i in range(len(chroms)):
-			print >> f, chroms[i] + "\t" + starts[i] + "\t" + repr(ends2[i]) + "\t" + names[i] + "\t" + datab1[i] + "\t" + datab2[i] + "\t" + datab3[i] + "\t" + datab4[i] + "\t" + datab5[i] + "\t" + datab6[i] + "\t" + datab7[i] + "\t" + datab8[i]
-
-
-		f.close()
-		#intersect the two
-		import pybedtools
-		fse = pybedtools.BedTool('fseb_unextended.bed')
-		fee = pybedtools.BedTool('feeb_unextended.bed')
-		f = open('mcb_both.bed', 'w')
-		print >> f, fse.intersect(fee, wa=True)
+		#parquet and arrow inputs are given to bedtools as bed copies, written once per call and removed once it ends
+		sources = [self.hcf, self.mcf, self.mclf, self.hrsinef, self.mrb1b2f]
+		copies = _bedInputs(sources)
+		hcf, mcf, mclf, hrsinef, mrb1b2f = copies
+		parameters = _parameterDict(extend_sine, extend_circRNA, extend_intron, comp_distance_buffer_high, comp_distance_buffer_low)
+		reads = null
+		if prefetch and (workers > 1 or memory_limit != null):
+			#the steps run in forked workers that cannot see lines held by this process, and a budget keeps the files streamed, so the files are only paged in
+			reads = lambda: _prefetch([], [hcf, mcf, mclf, hrsinef, mrb1b2f, eiom])
+		elif prefetch:
+			reads = lambda: _prefetch([hcf, mcf, mclf], [hrsinef, mrb1b2f, eiom])
+		global _MEMORY_LIMIT, _COMPRESSION, _COMPRESSION_THREADS
+		if memory_limit != null:
+			_MEMORY_LIMIT = _parseSize(memory_limit) // max(workers, 1)
+		_COMPRESSION = _compression(compress)
+		_COMPRESSION_THREADS = compress_threads
+		try:
+			bundle = null
+			if human_bundle != null:
+				bundle = _humanBundle(human_bundle, hcf, hrsinef, extend_sine, extend_circRNA)
+			stages = self._mainParserStages(eiom, hcf, mcf, mclf, hrsinef, mrb1b2f, parameters, banded_join, bundle)
+			run = lambda: _runStages(stages, parameters, MAIN_PARSER_JOURNAL, resume, workers, reads)
+			if progress:
+				_reporting('mainParser', [stage[0] for stage in stages], progress, progress_interval, run)
+			else:
+				run()
+		finally:
+			_PREFETCHED.clear()
+			_MEMORY_LIMIT = null
+			_COMPRESSION = null
+			_COMPRESSION_THREADS = 4
+			_removeBedCopies(sources, copies)
+			_resetSymbols()
+		print "This function has saved 39 files to your computer, but four of them are of interest:"
+		print "mcbb_nodups.bed contains the circRNA from the genome of interest that correspond to circRNAs in human and contain sine equivalents on both sides within the specified sine buffer while also containing sines on both sides within the sine buffer on its human equivalent"
+		print "imcbb_unextended.bed contains the flanking introns of the circRNA contained in the mcbb_nodups.bed file"
+		print "hcfn_nodups.bed is the human circRNA that corresponds to the mcbb_nodups.bed circRNA"
+		print "nlhm_final.bed is the bed file containing both the human circRNA and the circRNA in mcbb_nodups.bed that corresponds side by side in a bed formatted list"
+		if sqlite != null:
+			self.writeSQLite(sqlite, '.', dict(parameters, eiom=eiom), [stage[0] for stage in stages])
+			print "The files saved by this function were also written as tables of " + sqlite
+		if columnar != null:
+			self.writeColumnar('.', columnar, files=[stage[0] for stage in stages])
+			print "The files saved by this function were also written as " + columnar + " files"
+		return ConservationResults('.')
+	def equivalenceCheck(self, feiom=None, engines=('memory', 'incremental', 'banded', 'parallel'), directory='equivalence', rows=5):
+		''' Runs the legacy path of mainParser (bedtools and sort | uniq) and alternative engines side by side on the inputs of this class, and checks that they save the same rows.
+			Each run saves its files in its own subdirectory of directory, legacy first and then one per engine.  Every file saved by both the legacy path and an engine is compared as a multiset of rows, ignoring row order and blank lines, and the first rows found in only one of them are reported.
+			Each stage time of an engine is set against the legacy time of the steps since its previous stage, giving a speedup per stage, and the time of the whole run against the legacy run gives the overall speedup.  The report is printed, saved as equivalence_report.json in directory, and returned.
+		
+		:param feiom: a string representing the file containing the extended introns of the genome of interest (default "extended_intron_file.bed")
+		:type feiom: string
+		:param engines: the engines to check, each a name in EQUIVALENCE_ENGINES ('memory' for the in-memory engine of incrementalParser(), 'incremental' for incrementalParser() itself, grouping included, 'banded' for mainParser with banded_join=True, 'parallel' for mainParser with workers=4) or a function f(parser, eiom, parameters, timings) that saves its files in the current directory and records the seconds of each file in timings (default all four)
+		:type engines: list
+		:param directory: the directory the runs are saved under (default 'equivalence')
+		:type directory: string
+		:param rows: the number of divergent rows reported per file (default 5)
+		:type rows: int
+		:returns: dictionary from engine name to {'equivalent': bool, 'files': {file: comparison}, 'speedups': {file or 'total': legacy seconds / engine seconds}}
+		'''
+		eiom = "extended_intron_file.bed"
+		if feiom != null:
+			eiom = feiom
+		eiom = os.path.abspath(eiom)
+		p = self._parameters()
+		#the runs happen in other directories, so they get the input files by absolute name
+		files = [os.path.abspath(f) if f != null else null for f in (self.ef, self.hcf, self.mcf, self.mclf, self.hrsinef, self.mrb1b2f)]
+		parser = DataParser(*(files + [p['extend_sine'], p['extend_circRNA'], p['extend_intron'], p['comp_distance_buffer_high'], p['comp_distance_buffer_low']]))
+		runs = [('legacy', _legacyEngine)]
+		for engine in engines:
+			if callable(engine):
+				runs.append((getattr(engine, '__name__', repr(engine)), engine))
+			else:
+				runs.append((engine, EQUIVALENCE_ENGINES[engine]))
+		import time
+		timings = dict()
+		walls = dict()
+		cwd = os.getcwd()
+		for name, engine in runs:
+			timings[name] = dict()
+			path = os.path.join(directory, name)
+			if not os.path.isdir(path):
+				os.makedirs(path)
+			os.chdir(path)
+			began = time.time()
+			try:
+				engine(parser, eiom, p, timings[name])
+			finally:
+				os.chdir(cwd)
+			walls[name] = time.time() - began
+		order = [filename for filename, columns in MAIN_PARSER_OUTPUTS]
+		report = dict()
+		for name, engine in runs[1:]:
+			compared = dict()
+			for filename in order:
+				legacy = os.path.join(directory, 'legacy', filename)
+				other = os.path.join(directory, name, filename)
+				if os.path.exists(legacy) and os.path.exists(other):
+					compared[filename] = _compareRows(legacy, other, rows)
+			equivalent = all([c['equal'] for c in compared.values()])
+			speedups = _speedups(order, timings['legacy'], timings[name])
+			#stages of a parallel run overlap, so the overall speedup is taken from the whole runs
+			speedups['total'] = walls['legacy'] / walls[name] if walls[name] > 0 else null
+			report[name] = {'equivalent': equivalent, 'files': compared, 'speedups': speedups}
+			overall = speedups.get('total')
+			print name + ": " + ("same rows as legacy" if equivalent else "DIFFERENT rows from legacy") + " in " + repr(len(compared)) + " files" + ("" if overall == null else ", " + ("%.2f" % overall) + "x the legacy speed overall")
+			for filename in order:
+				if filename in compared and not compared[filename]['equal']:
+					c = compared[filename]
+					print "  " + filename + ": " + repr(c['legacy_rows']) + " legacy rows, " + repr(c['rows']) + " rows"
+					for row in c['missing']:
+						print "    only in legacy: " + row
+					for row in c['extra']:
+						print "    only in " + name + ": " + row
+		f = open(os.path.join(directory, 'equivalence_report.json'), 'w')
+		json.dump({'engines': report, 'timings': timings, 'seconds': walls}, f, indent=1, sort_keys=True)
 		f.close()
-		#more duplicates
-		os.system("cat 'mcb_both.bed' | sort | uniq > mcbb_nodups.bed")
-		#intersect the bed file with the introns
-		mcbb = pybedtools.BedTool('mcbb_nodups.bed')
-		eiom4 = pybedtools.BedTool(eiom)
-		f = open('introns_mcbb.bed', 'w')
-		print >> f, eiom4.intersect(mcbb, wa=True)
+		return report
+	def prefetch(self, workers=6):
+		''' Starts reading ef, hcf, mcf, mclf, hrsinef and mrb1b2f all at once in a pool of threads, instead of one at a time when each is first needed.
+			ef, hcf, mcf and mclf are parsed as they are read, and a later read of one of them by this class waits only for that file, while the others go on loading.  hrsinef and mrb1b2f, which only bedtools reads, are read through into the page cache.
+			The parsed files are held until the next call of mainParser() returns, which streams them instead when it runs with a memory_limit.  Parquet and Arrow inputs are not read ahead.
+		
+		:param workers: the number of files read at the same time (default 6)
+		:type workers: int
+		'''
+		files = [f for f in (self.ef, self.hcf, self.mcf, self.mclf, self.hrsinef, self.mrb1b2f) if f != null and _columnarFormat(f) == null]
+		_prefetch([f for f in files if f not in (self.hrsinef, self.mrb1b2f)], [f for f in files if f in (self.hrsinef, self.mrb1b2f)], workers)
+	def _parameters(self):
+		''' Returns the five parameters of this class as the dictionary the steps and engines take '''
+		return _parameterDict(self.extend_sine, self.extend_circRNA, self.extend_intron, self.comp_distance_buffer_high, self.comp_distance_buffer_low)
+	def _mainParserStages(self, eiom, hcf, mcf, mclf, hrsinef, mrb1b2f, p, banded_join=False, bundle=None):
+		''' Lists the steps of mainParser() in the order they run.  Each step is (output file, input files, names of the parameters it uses, function, arguments), and is run by calling the function with the file to write followed by the arguments.
+			With bundle, the directory of a human bundle, the human side steps read from its files instead, see _humanBundle().
+		'''
+		es = p['extend_sine']
+		ec = p['extend_circRNA']
+		ei = p['extend_intron']
+		stages = [
+			#extend the lifted circRNAs so they can be intersected with the human circRNAs
+			('extended_lifted_mouse_circRNA_file.bed', [mclf], ['extend_circRNA'], _shiftColumns, (mclf, 12, {1: -ec, 2: ec})),
+			('hcf_elmcf.bed', [hcf, 'extended_lifted_mouse_circRNA_file.bed'], [], _intersect, (hcf, 'extended_lifted_mouse_circRNA_file.bed', False)),
+			#have to extend each side one at a time
+			('hcf_elmcf_same_start.bed', ['hcf_elmcf.bed'], ['extend_sine'], _shiftColumns, ('hcf_elmcf.bed', 12, {1: -es})),
+			('hcf_elmcf_same_end.bed', ['hcf_elmcf.bed'], ['extend_sine'], _shiftColumns, ('hcf_elmcf.bed', 12, {2: es})),
+			#intersect to get files for both sides
+			('hcf_elmcfss_sine.bed', ['hcf_elmcf_same_start.bed', hrsinef], [], _intersect, ('hcf_elmcf_same_start.bed', hrsinef, False)),
+			('hcf_elmcfse_sine.bed', ['hcf_elmcf_same_end.bed', hrsinef], [], _intersect, ('hcf_elmcf_same_end.bed', hrsinef, False)),
+			#unextend each file
+			('hcf_elmcfsss_unextended.bed', ['hcf_elmcfss_sine.bed'], ['extend_sine'], _shiftColumns, ('hcf_elmcfss_sine.bed', 12, {1: es})),
+			('hcf_elmcfses_unextended.bed', ['hcf_elmcfse_sine.bed'], ['extend_sine'], _shiftColumns, ('hcf_elmcfse_sine.bed', 12, {2: -es})),
+			('hesu_nodups.bed', ['hcf_elmcfsss_unextended.bed'], [], _dedup, ('hcf_elmcfsss_unextended.bed',)),
+			('heeu_nodups.bed', ['hcf_elmcfses_unextended.bed'], [], _dedup, ('hcf_elmcfses_unextended.bed',)),
+			#intersect the two files to get the human circRNAs that have sines on both sides
+			('hcb_sine.bed', ['hesu_nodups.bed', 'heeu_nodups.bed'], [], _intersect, ('hesu_nodups.bed', 'heeu_nodups.bed', False)),
+			('hcbs_nodups.bed', ['hcb_sine.bed'], [], _dedup, ('hcb_sine.bed',)),
+			('hcbs_reextended.bed', ['hcbs_nodups.bed'], ['extend_circRNA'], _shiftColumns, ('hcbs_nodups.bed', 12, {1: -ec, 2: ec})),
+			('hc_extended.bed', [hcf], ['extend_circRNA'], _shiftColumns, (hcf, 12, {1: -ec, 2: ec})),
+			#lifted circRNAs in the same place as a human circRNA, then those in the same place as a human circRNA flanked by sines
+			('mc_same.bed', [mclf, 'hc_extended.bed'], [], _intersect, (mclf, 'hc_extended.bed', False)),
+			('mc_same_sine.bed', ['mc_same.bed', 'hcbs_reextended.bed'], [], _intersect, ('mc_same.bed', 'hcbs_reextended.bed', False)),
+			('mcss_nodups.bed', ['mc_same_sine.bed'], [], _dedup, ('mc_same_sine.bed',)),
+			#force liftover of mc_same back to the coords of the genome of interest
+			('forced_liftover_mcss.bed', ['mcss_nodups.bed', mcf], [], _forceLiftover, ('mcss_nodups.bed', 12, mcf, False)),
+			#use the B1 and B2 file to determine which of these circRNAs have B1 or B2 within extend_sine on both sides
+			('flm_start_extended.bed', ['forced_liftover_mcss.bed'], ['extend_sine'], _shiftColumns, ('forced_liftover_mcss.bed', 12, {1: -es})),
+			('flm_end_extended.bed', ['forced_liftover_mcss.bed'], ['extend_sine'], _shiftColumns, ('forced_liftover_mcss.bed', 12, {2: es})),
+			('fse_b1b2.bed', ['flm_start_extended.bed', mrb1b2f], [], _intersect, ('flm_start_extended.bed', mrb1b2f, False)),
+			('fee_b1b2.bed', ['flm_end_extended.bed', mrb1b2f], [], _intersect, ('flm_end_extended.bed', mrb1b2f, False)),
+			('fseb_unextended.bed', ['fse_b1b2.bed'], ['extend_sine'], _shiftColumns, ('fse_b1b2.bed', 12, {1: es})),
+			('feeb_unextended.bed', ['fee_b1b2.bed'], ['extend_sine'], _shiftColumns, ('fee_b1b2.bed', 12, {2: -es})),
+			('mcb_both.bed', ['fseb_unextended.bed', 'feeb_unextended.bed'], [], _intersect, ('fseb_unextended.bed', 'feeb_unextended.bed', False)),
+			('mcbb_nodups.bed', ['mcb_both.bed'], [], _dedup, ('mcb_both.bed',)),
+			#intersect the circRNAs with the introns, then unextend the introns
+			('introns_mcbb.bed', [eiom, 'mcbb_nodups.bed'], [], _intersect, (eiom, 'mcbb_nodups.bed', False)),
+			('imcbb_unextended.bed', ['introns_mcbb.bed'], ['extend_intron'], _shiftColumns, ('introns_mcbb.bed', 4, {1: ei, 2: -ei})),
+			#to get human circRNA from mouse circRNA
+			('forced_liftover_mcf_human.bed', ['mcbb_nodups.bed', mclf], [], _forceLiftover, ('mcbb_nodups.bed', 12, mclf, False)),
+			('humanCircRNAfinalextended.bed', ['hc_extended.bed', 'forced_liftover_mcf_human.bed'], [], _intersect, ('hc_extended.bed', 'forced_liftover_mcf_human.bed', True)),
+			('hcf_normal.bed', ['humanCircRNAfinalextended.bed'], ['extend_circRNA'], _shiftColumns, ('humanCircRNAfinalextended.bed', 12, {1: ec, 2: -ec})),
+			('hcfn_nodups.bed', ['hcf_normal.bed'], [], _dedup, ('hcf_normal.bed',)),
+			#get the data lined up side by side
+			('hcrpm.bed', ['forced_liftover_mcf_human.bed', 'hc_extended.bed'], [], _intersect, ('forced_liftover_mcf_human.bed', 'hc_extended.bed', True)),
+			('hcrpm_nodups.bed', ['hcrpm.bed'], [], _dedup, ('hcrpm.bed',)),
+			('cofmv.bed', ['hcrpm_nodups.bed'], [], _pickColumns, ('hcrpm_nodups.bed', 24, [0, 1, 2, 3, 12, 13, 14, 15])),
+			#have to liftOver mouse back to mouse genome, then unextend the RNAs on the human side
+			('comhvp.bed', ['cofmv.bed', mcf], [], _forceLiftover, ('cofmv.bed', 8, mcf, True)),
+			('comparison_of_mouse_human_final.bed', ['comhvp.bed'], ['extend_circRNA'], _shiftColumns, ('comhvp.bed', 8, {5: ec, 6: -ec})),
+		]
+		if bundle != null:
+			#the bundle holds every human circRNA flanked on each side, so those of hcf_elmcf are picked out of it
+			start_flanked = os.path.join(bundle, 'start_flanked.bed')
+			end_flanked = os.path.join(bundle, 'end_flanked.bed')
+			human_extended = os.path.join(bundle, 'hc_extended.bed')
+			stages[2:10] = [
+				('hesu_nodups.bed', ['hcf_elmcf.bed', start_flanked], [], _flankedRows, ('hcf_elmcf.bed', start_flanked)),
+				('heeu_nodups.bed', ['hcf_elmcf.bed', end_flanked], [], _flankedRows, ('hcf_elmcf.bed', end_flanked)),
+			]
+			stages = [('hc_extended.bed', [human_extended], [], _copyRows, (human_extended,)) if stage[0] == 'hc_extended.bed' else stage for stage in stages]
+		if banded_join:
+			#pair the lifted circRNAs with the human circRNAs within the buffers in one join
+			stages.append(('narrow_list_human_mouse.bed', ['forced_liftover_mcf_human.bed', hcf], ['comp_distance_buffer_low', 'comp_distance_buffer_high', 'extend_circRNA'], _bandedPairs, ('forced_liftover_mcf_human.bed', hcf, p['comp_distance_buffer_low'], p['comp_distance_buffer_high'], ec)))
+		else:
+			stages.append(('cofmvv_use.bed', ['cofmv.bed'], ['extend_circRNA'], _shiftColumns, ('cofmv.bed', 8, {5: ec, 6: -ec})))
+			#have to make sure human coords in comparison file are within the buffers on both start and end of mouse
+			stages.append(('narrow_list_human_mouse.bed', ['cofmvv_use.bed'], ['comp_distance_buffer_low', 'comp_distance_buffer_high'], _filterPairs, ('cofmvv_use.bed', p['comp_distance_buffer_low'], p['comp_distance_buffer_high'])))
+		stages.append(('nlhm_final.bed', ['narrow_list_human_mouse.bed', mcf], [], _forceLiftover, ('narrow_list_human_mouse.bed', 8, mcf, True)))
+		return stages
+	def writeSQLite(self, database, directory='.', parameters=None, files=None):
+		''' Writes every file saved by mainParser() into one SQLite database, one table per file named after the file without .bed, plus a run_parameters table.
+			Each table is replaced if it already exists, loaded with executemany inside one transaction, and indexed on name, chrom and (chrom, chromStart, chromEnd); the side by side tables are also indexed on the second name column.
+			Files that are missing from the directory are skipped.  When files is given, only those files are written and the tables of the other files of mainParser() are dropped, so none is left over from an earlier run.
+		
+		:param database: the name of the SQLite database file, created if it does not exist
+		:type database: string
+		:param directory: the directory containing the files saved by mainParser() (default the current directory)
+		:type directory: string
+		:param parameters: the parameters of the run to record, as a dictionary (default the parameters of this class)
+		:type parameters: dict
+		:param files: the names of the files of the run, such as the steps a mainParser() call ran (default every file of mainParser() found in directory)
+		:type files: list
+		'''
+		import sqlite3
+		if parameters == null:
+			parameters = self._parameters()
+		run = {'ef': self.ef, 'hcf': self.hcf, 'mcf': self.mcf, 'mclf': self.mclf, 'hrsinef': self.hrsinef, 'mrb1b2f': self.mrb1b2f, 'directory': os.path.abspath(directory)}
+		run.update(parameters)
+		conn = sqlite3.connect(database)
+		conn.text_factory = str
+		try:
+			with conn:
+				conn.execute('DROP TABLE IF EXISTS run_parameters')
+				conn.execute('CREATE TABLE run_parameters (key TEXT PRIMARY KEY, value TEXT)')
+				conn.executemany('INSERT INTO run_parameters VALUES (?, ?)', [(key, str(run[key])) for key in sorted(run)])
+			for filename, columns in MAIN_PARSER_OUTPUTS:
+				table = filename[:-4]
+				if files != null and filename not in files:
+					with conn:
+						conn.execute('DROP TABLE IF EXISTS ' + table)
+					continue
+				path = os.path.join(directory, filename)
+				if not os.path.exists(path):
+					print filename + " was not found in " + directory + ", skipping it"
+					continue
+				with conn:
+					conn.execute('DROP TABLE IF EXISTS ' + table)
+					conn.execute('CREATE TABLE ' + table + ' (' + ', '.join([c + ' ' + t for c, t in columns]) + ')')
+					conn.executemany('INSERT INTO ' + table + ' VALUES (' + ', '.join(['?'] * len(columns)) + ')', _typedRows(path, columns))
+					conn.execute('CREATE INDEX ' + table + '_name ON ' + table + ' (name)')
+					conn.execute('CREATE INDEX ' + table + '_chrom ON ' + table + ' (chrom)')
+					conn.execute('CREATE INDEX ' + table + '_region ON ' + table + ' (chrom, chromStart, chromEnd)')
+					if columns is _PAIR_COLUMNS:
+						conn.execute('CREATE INDEX ' + table + '_human_name ON ' + table + ' (human_name)')
+					if columns is _BED12_PAIR_COLUMNS:
+						conn.execute('CREATE INDEX ' + table + '_b_name ON ' + table + ' (b_name)')
+		finally:
+			conn.close()
+	def writeColumnar(self, directory='.', format='parquet', outdir=None, files=None):
+		''' Writes every file saved by mainParser() as a Parquet or Arrow IPC file named after the file, with int64 coordinate columns and string columns otherwise, using the same column names as writeSQLite().
+			Files that are missing from the directory are skipped, and so are the files not in files when it is given.  Requires pyarrow.
+		
+		:param directory: the directory containing the files saved by mainParser() (default the current directory)
+		:type directory: string
+		:param format: 'parquet' or 'arrow' (default 'parquet')
+		:type format: string
+		:param outdir: the directory to write the columnar files to (default directory), created if needed
+		:type outdir: string
+		:param files: the names of the files of the run, such as the steps a mainParser() call ran (default every file of mainParser() found in directory)
+		:type files: list
+		'''
+		if format not in _COLUMNAR_EXTENSIONS:
+			raise ValueError('format must be parquet or arrow, not ' + str(format))
+		if outdir == null:
+			outdir = directory
+		if not os.path.isdir(outdir):
+			os.makedirs(outdir)
+		for filename, columns in MAIN_PARSER_OUTPUTS:
+			if files != null and filename not in files:
+				continue
+			path = os.path.join(directory, filename)
+			if not os.path.exists(path):
+				print filename + " was not found in " + directory + ", skipping it"
+				continue
+			_writeColumnar(os.path.join(outdir, filename[:-4] + _COLUMNAR_EXTENSIONS[format][0]), _typedRows(path, columns), columns, format)
+	def intronPairs(self, inf2=None, circfile='mcbb_nodups.bed', outfile='flanking_intron_pairs.bed', fextend_intron=None):
+		''' Finds, for every circRNA of circfile, the pair of introns bordering its back-splice junction with an IntronPairIndex, instead of intersecting the whole extended intron file as mainParser does for imcbb_unextended.bed.
+			The intron before the circRNA must end within extend_intron of its start and the intron after it must start within extend_intron of its end; a pair from a common transcript is preferred.
+			1 file is saved, holding one row per circRNA: its chrom, start, end and name, then the chrom, start, end and name of the intron before it and of the intron after it ('.' in each column of a side with no intron)
+		
+		:param inf2: Optional string naming an intron file (unextended, as saved by exonToIntron()) (default "intron_file.bed")
+		:type inf2: string
+		:param circfile: the name of the circRNA file (default "mcbb_nodups.bed", saved by mainParser())
+		:type circfile: string
+		:param outfile: the name of the file to save (default "flanking_intron_pairs.bed")
+		:type outfile: string
+		:param fextend_intron: the number of nt an intron may end or start away from the junction (default extend_intron as defined by the class)
+		:type fextend_intron: int
+		:returns: the number of circRNAs with both introns found
+		'''
+		inf = "intron_file.bed"
+		if inf2 != null:
+			inf = inf2
+		extend_intron = self.extend_intron
+		if fextend_intron != null:
+			extend_intron = fextend_intron
+		index = IntronPairIndex(_readBed(inf))
+		both = 0
+		f = open(outfile + '.tmp', 'w')
+		for row in _iterBed(circfile):
+			sides = index.flanking(row[0], int(row[1]), int(row[2]), extend_intron)
+			if sides[0] != null and sides[1] != null:
+				both += 1
+			print >> f, "\t".join(row[:4] + [field for i in sides for field in (index.rows[i][:4] if i != null else ['.'] * 4)])
 		f.close()
-		#unextend the intron files
-		database = list()
-		with open('introns_mcbb.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-		chroms = database[0::4]
-		starts = database[1::4]
-		ends = database[2::4]
-		names = database[3::4]
-		starts2 = list()
-		ends2 = list()
-		for x in starts:
-			one_start = int(x)
-			one_start = one_start + extend_intron
-			starts2.append(one_start)
-
-
-		for x in ends:
-			one_end = int(x)
-			one_end = one_end - extend_intron
-			ends2.append(one_end)
-
-
-		f = open('imcbb_unextended.bed', 'w')
-		for i in range(len(chroms)):
-			print >> f, chroms[i] + "\t" + repr(starts2[i]) + "\t" + repr(ends2[i]) + "\t" + names[i]
-
-
+		_replace(outfile + '.tmp', outfile)
+		print "The flanking intron pairs of the circRNAs in " + circfile + " are saved under " + outfile + ", " + repr(both) + " with an intron on both sides"
+		return both
+	def repeatDistances(self):
+		''' Computes, once per circRNA, the distance to the nearest repeat on its start side and on its end side, for hcf against hrsinef and for mcf against mrb1b2f, so flanking can be checked for any extend_sine with flankedByDistance() without touching the repeat files again.
+			2 files are saved: hcf_repeat_distances.bed and mcf_repeat_distances.bed, holding the chrom, start, end and name of each circRNA followed by the start side and end side distances ('.' when there is no repeat on that side of the chromosome)
+			The distances are measured so that a circRNA passes the start side and end side intersects of mainParser exactly when they are below extend_sine; a repeat overlapping the circRNA itself gives a distance of zero or less.
+		'''
+		_writeRepeatDistances('hcf_repeat_distances.bed', self.hcf, self.hrsinef)
+		_writeRepeatDistances('mcf_repeat_distances.bed', self.mcf, self.mrb1b2f)
+		print "The repeat distances of the human circRNAs and of the circRNAs of the genome of interest are saved under hcf_repeat_distances.bed and mcf_repeat_distances.bed"
+	def flankedByDistance(self, distances='hcf_repeat_distances.bed', extend_sine=None):
+		''' Returns the circRNAs of a file saved by repeatDistances() that have a repeat within extend_sine on both sides
+		
+		:param distances: string of the file saved by repeatDistances() (default "hcf_repeat_distances.bed")
+		:type distances: string
+		:param extend_sine: the number of nt that is the max distance away from the circRNA for a repeat to be considered flanking (default self.extend_sine)
+		:type extend_sine: int
+		:returns: list of the rows of the file that are flanked on both sides
+		'''
+		if extend_sine == null:
+			extend_sine = self.extend_sine
+		return [row for row in _readBed(distances) if row[4] != '.' and row[5] != '.' and int(row[4]) < extend_sine and int(row[5]) < extend_sine]
+	def familyFlanks(self, hrmsk, mrmsk, classes=('SINE',), subfamilies=False, outfile='family_flanks.bed'):
+		''' Reports, in one pass over the circRNAs, which repeat families flank each corresponding pair of circRNAs, from full RepeatMasker tables instead of the single family files hrsinef and mrb1b2f.
+			The pairs are the lifted circRNAs of mclf and the human circRNAs of hcf whose start and end differences lie between comp_distance_buffer_low and comp_distance_buffer_high, with the genome of interest side given in its own coords from mcf as in nlhm_final.bed.
+			Each row of outfile holds the 8 columns of nlhm_final.bed, the start and end differences, then the comma separated families that flank the human circRNA on both sides and those that flank the circRNA of the genome of interest on both sides ('.' for none).
+		
+		:param hrmsk: the name of the human RepeatMasker table (UCSC rmsk, RepeatMasker .out, or bed with the family in the name column)
+		:type hrmsk: string
+		:param mrmsk: the name of the RepeatMasker table of the genome of interest
+		:type mrmsk: string
+		:param classes: the repeat classes to keep, or None for every class (default ('SINE',))
+		:type classes: tuple
+		:param subfamilies: if True, report subfamilies (repName) instead of families (repFamily) (default False)
+		:type subfamilies: bool
+		:param outfile: string of the file to write (default "family_flanks.bed")
+		:type outfile: string
+		'''
+		human_repeats = RepeatFamilyIndex(hrmsk, classes)
+		genome_repeats = RepeatFamilyIndex(mrmsk, classes)
+		mcf = _readBed(self.mcf)
+		mouse = _nameIndex(mcf)
+		f = open(outfile, 'w')
+		for lifted, human, start_delta, end_delta in _bandedJoin(_readBed(self.mclf), _readBed(self.hcf), self.comp_distance_buffer_low, self.comp_distance_buffer_high, self.extend_circRNA):
+			human_families = human_repeats.flankedBy(human[0], int(human[1]), int(human[2]), self.extend_sine, subfamilies)
+			for j in mouse.get(lifted[3], []):
+				row = mcf[j]
+				genome_families = genome_repeats.flankedBy(row[0], int(row[1]), int(row[2]), self.extend_sine, subfamilies)
+				print >> f, "\t".join(row[:4] + human[:4] + [repr(start_delta), repr(end_delta), ",".join(human_families) or '.', ",".join(genome_families) or '.'])
 		f.close()
-		#toget human circRNA from mouse circRNA
-		data = list()
-		with open('mcbb_nodups.bed') as tsv:
-			 for line in csv.reader(tsv, dialect="excel-tab"):
-					 for word in line:
-							 data.append(word)
-
-		 
-		chroms = data[0::12]
-		starts = data[1::12]
-		ends = data[2::12]
-		names = data[3::12]
-		data1 = data[4::12]
-		data2 = data[5::12]
-		data3 = data[6::12]
-		data4 = data[7::12]
-		data5 = data[8::12]
-		data6 = data[9::12]
-		data7 = data[10::12]
-		data8 = data[11::12]
-		database = list()
-		with open(mclf) as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-		chroms2 = database[0::12]
-		starts2 = database[1::12]
-		ends2 = database[2::12]
-		names2 = database[3::12]
-		datab1 = database[4::12]
-		datab2 = database[5::12]
-		datab3 = database[6::12]
-		datab4 = database[7::12]
-		datab5 = database[8::12]
-		datab6 = database[9::12]
-		datab7 = database[10::12]
-		datab8 = database[11::12]
-
-		f = open('forced_liftover_mcf_human.bed', 'w')
-
-		for i in range(len(chroms)):
-			for j in range(len(chroms2)):
-				if names2[j] == names[i]:
-					print >> f, chroms2[j] + "\t" + starts2[j] + "\t" + ends2[j] + "\t" + names2[j] + "\t" + datab1[j] + "\t" + datab2[j] + "\t" + datab3[j] + "\t" +  datab4[j] + "\t" + datab5[j] + "\t" + datab6[j] + "\t" + datab7[j] + "\t" + datab8[j]
-
-
+		print "The repeat families flanking each pair of corresponding circRNAs are saved under " + outfile
+	def flankEnrichment(self, genome, circfile='forced_liftover_mcss.bed', repeatfile=None, extend_sine=None, permutations=1000, gaps=None, processes=1, seed=0):
+		''' Tests whether the circRNAs of circfile are flanked by repeats on both sides more often than random placements of them, see flankEnrichment() of this module, and prints the result
+		
+		:param genome: the name of a file of chromosome sizes of the genome of circfile, "chrom<tab>size" per line
+		:type genome: string
+		:param circfile: string of the bed file of circRNAs to test (default "forced_liftover_mcss.bed", the circRNAs mainParser tests against mrb1b2f)
+		:type circfile: string
+		:param repeatfile: string of the bed file of repeats (default self.mrb1b2f)
+		:type repeatfile: string
+		:param extend_sine: the flanking distance (default self.extend_sine)
+		:type extend_sine: int
+		:param permutations: the number of random placements (default 1000)
+		:type permutations: int
+		:param gaps: Optional string naming a bed file of regions to keep random placements out of (default None)
+		:type gaps: string
+		:param processes: the number of processes to spread the permutations over (default 1)
+		:type processes: int
+		:param seed: the seed of the run (default 0)
+		:type seed: int
+		:returns: the dictionary returned by flankEnrichment()
+		'''
+		if repeatfile == null:
+			repeatfile = self.mrb1b2f
+		if extend_sine == null:
+			extend_sine = self.extend_sine
+		result = flankEnrichment(circfile, repeatfile, genome, extend_sine, permutations, gaps, processes, seed)
+		print repr(result['observed']) + " of " + repr(result['total']) + " circRNAs in " + circfile + " are flanked on both sides, against " + ("%.1f" % result['expected']) + " expected by chance (empirical p-value " + ("%.4g" % result['p_value']) + " over " + repr(permutations) + " permutations)"
+		return result
+	def coverageIndexes(self, resolution=1):
+		''' Builds memory mapped coverage indexes of hrsinef and mrb1b2f, saved as hrsinef_coverage.idx and mrb1b2f_coverage.idx, or opens them if they were already built at this resolution from files no newer than them, see buildCoverageIndex().
+			buildIndex(coverage=True) answers the flank checks of a ConservationIndex from them.
+		
+		:param resolution: the number of nt per bin of the indexes (default 1, exact)
+		:type resolution: int
+		:returns: (CoverageIndex of hrsinef, CoverageIndex of mrb1b2f)
+		'''
+		indexes = list()
+		for repeatfile, path in ((self.hrsinef, 'hrsinef_coverage.idx'), (self.mrb1b2f, 'mrb1b2f_coverage.idx')):
+			if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(repeatfile):
+				buildCoverageIndex(repeatfile, path, resolution)
+			index = CoverageIndex(path)
+			if index.resolution != resolution or index.layout != COVERAGE_LAYOUT:
+				index.close()
+				buildCoverageIndex(repeatfile, path, resolution)
+				index = CoverageIndex(path)
+			indexes.append(index)
+		return tuple(indexes)
+	def sharedIndexes(self):
+		''' Builds memory mapped interval indexes of hcf, mcf, mclf, hrsinef and mrb1b2f, saved as hcf_shared.idx, mcf_shared.idx, mclf_shared.idx, hrsinef_shared.idx and mrb1b2f_shared.idx, or opens them if they were already built from files no newer than them, see buildSharedIndex().
+			Worker processes that call this on the same directory attach to the same pages instead of each parsing and holding the tables.
+		
+		:returns: (SharedIntervalIndex of hcf, of mcf, of mclf, of hrsinef, of mrb1b2f)
+		'''
+		indexes = list()
+		for bedfile, path in ((self.hcf, 'hcf_shared.idx'), (self.mcf, 'mcf_shared.idx'), (self.mclf, 'mclf_shared.idx'), (self.hrsinef, 'hrsinef_shared.idx'), (self.mrb1b2f, 'mrb1b2f_shared.idx')):
+			if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(bedfile):
+				buildSharedIndex(bedfile, path)
+			indexes.append(SharedIntervalIndex(path))
+		return tuple(indexes)
+	def humanBundle(self, directory='human_bundles', fextend_sine=None, fextend_circRNA=None):
+		''' Builds the human side files of mainParser once, for mainParser(human_bundle=directory) to reuse with any genome of interest: hc_extended.bed, and the human circRNAs of hcf with a SINE of hrsinef within extend_sine of their start (start_flanked.bed) and of their end (end_flanked.bed).
+			Each bundle is a subdirectory of directory named after the md5 of hcf and of hrsinef, the two parameters and the bundle version, with a bundle.json manifest, so bundles for other inputs or parameters sit side by side and a changed input is never read from a stale bundle.  A bundle that already exists is reused as it is.
+			The files are bed files, read memory mapped like the other inputs.
+		
+		:param directory: the directory holding the bundles, created if needed (default "human_bundles")
+		:type directory: string
+		:param fextend_sine: the extend_sine of the bundle (default extend_sine as defined by the class)
+		:type fextend_sine: int
+		:param fextend_circRNA: the extend_circRNA of the bundle (default extend_circRNA as defined by the class)
+		:type fextend_circRNA: int
+		:returns: the directory of the bundle
+		'''
+		extend_sine = self.extend_sine
+		if fextend_sine != null:
+			extend_sine = fextend_sine
+		extend_circRNA = self.extend_circRNA
+		if fextend_circRNA != null:
+			extend_circRNA = fextend_circRNA
+		sources = [self.hcf, self.hrsinef]
+		copies = _bedInputs(sources, ['hcf', 'hrsinef'])
+		try:
+			bundle = _humanBundle(directory, copies[0], copies[1], extend_sine, extend_circRNA)
+		finally:
+			_removeBedCopies(sources, copies)
+		print "The human bundle of hcf and hrsinef is saved under " + bundle
+		return bundle
+	def buildIndex(self, inf=None, shared=False, coverage=False):
+		''' Loads hcf, mcf, mclf, hrsinef, mrb1b2f and optionally an intron file into a ConservationIndex held in memory, using the parameters of this class as the query defaults
+		
+		:param inf: Optional string naming an intron file (unextended, as produced by exonToIntron()) used to report the flanking introns of conserved circRNAs (default None)
+		:type inf: string
+		:param shared: if True, attach to the memory mapped indexes of sharedIndexes() instead of reading the five files into this process (default False)
+		:type shared: bool
+		:param coverage: if True, check flanking repeats against the memory mapped indexes of coverageIndexes() instead of an interval index of the repeat files (default False)
+		:type coverage: bool
+		:returns: ConservationIndex
+		'''
+		hcf, mcf, mclf, hrsinef, mrb1b2f = self.hcf, self.mcf, self.mclf, self.hrsinef, self.mrb1b2f
+		if shared:
+			hcf, mcf, mclf, hrsinef, mrb1b2f = self.sharedIndexes()
+		if coverage:
+			hrsinef, mrb1b2f = self.coverageIndexes()
+		return ConservationIndex(hcf, mcf, mclf, hrsinef, mrb1b2f, inf, self.extend_sine, self.extend_circRNA, self.extend_intron, self.comp_distance_buffer_high, self.comp_distance_buffer_low)
+	def serve(self, inf=None, host='127.0.0.1', port=8377, socket_path=None):
+		''' Loads the input files once and answers conservation and flank queries over localhost HTTP (or a Unix socket) until interrupted, see ConservationIndex.serve()
+		
+		:param inf: Optional string naming an intron file (unextended, as produced by exonToIntron()) (default None)
+		:type inf: string
+		:param host: the address to listen on (default '127.0.0.1')
+		:type host: string
+		:param port: the port to listen on (default 8377)
+		:type port: int
+		:param socket_path: if given, listen on this Unix socket instead of host and port (default None)
+		:type socket_path: string
+		'''
+		self.buildIndex(inf).serve(host, port, socket_path)
+	def incrementalParser(self, feiom=None, state='incremental_state.json'):
+		''' Brings the four files of interest of mainParser (mcbb_nodups.bed, imcbb_unextended.bed, hcfn_nodups.bed and nlhm_final.bed) up to date with hcf, mcf and mclf, computing again only the circRNAs affected since the last call.
+			The circRNAs are split into groups that cannot change each other's results: those within extend_circRNA of each other in human coords, those overlapping in the genome of interest, and the rows of mclf and mcf sharing a name.
+			The results of each group are kept in state, so when hcf, mcf or mclf gain, lose or change entries only the groups holding those entries are computed again, in memory, and the four files are rewritten.
+			Everything is computed again when the parameters of this class, hrsinef, mrb1b2f or the extended intron file have changed.  The files hold the same rows as mainParser writes, sorted, and no other file of mainParser is saved.
+		
+		:param feiom: a string representing the file containing the extended introns of the genome of interest (default "extended_intron_file.bed")
+		:type feiom: string
+		:param state: the name of the file keeping the groups and their results between calls (default 'incremental_state.json')
+		:type state: string
+		:returns: dictionary with the number of circRNAs 'added', 'removed' and 'changed' by name across hcf, mcf and mclf, and the number of groups 'computed' and 'kept'
+		'''
+		eiom = "extended_intron_file.bed"
+		if feiom != null:
+			eiom = feiom
+		p = self._parameters()
+		hashes = dict()
+		key = {'parameters': p, 'hrsinef': _fileHash(self.hrsinef, hashes), 'mrb1b2f': _fileHash(self.mrb1b2f, hashes), 'eiom': _fileHash(eiom, hashes)}
+		previous = {'key': key, 'records': {}, 'groups': {}}
+		if os.path.exists(state):
+			with open(state) as f:
+				previous = json.load(f)
+			if previous['key'] != key:
+				print "The parameters or repeat and intron files changed since the last call, so every circRNA is computed again"
+				previous = {'key': key, 'records': {}, 'groups': {}}
+		human = _readBed(self.hcf)
+		lifted = _readBed(self.mclf)
+		mouse = _readBed(self.mcf)
+		#each row is known to the state by its file and line
+		records = [("hcf\t" + "\t".join(row)) for row in human] + [("mclf\t" + "\t".join(row)) for row in lifted] + [("mcf\t" + "\t".join(row)) for row in mouse]
+		members = dict()
+		for i, group in enumerate(_circGroups(human, lifted, mouse, p['extend_circRNA'])):
+			members.setdefault(group, list()).append(i)
+		counts = dict()
+		for record in records:
+			counts[record] = counts.get(record, 0) + 1
+		#a group is kept when it holds exactly the rows of one group of the last call
+		old = previous['records']
+		ids = [int(g) for g in previous['groups']]
+		next_id = max(ids + [-1]) + 1
+		groups = dict()
+		dirty = list()
+		for group in members.values():
+			found = set([old[records[i]][0] if records[i] in old else null for i in group])
+			g = found.pop() if len(found) == 1 else null
+			if g != null and previous['groups'][g]['size'] == len(group) and all([old[records[i]][1] == counts[records[i]] for i in group]):
+				groups[g] = previous['groups'][g]
+				groups[g]['members'] = group
+			else:
+				groups[repr(next_id)] = {'size': len(group), 'members': group}
+				dirty.append((repr(next_id), group))
+				next_id += 1
+		if dirty:
+			sines = _intervalIndex(self.hrsinef)
+			b1b2 = _intervalIndex(self.mrb1b2f)
+			introns = _intervalIndex(eiom)
+			for g, group in dirty:
+				rows = {'hcf': list(), 'mclf': list(), 'mcf': list()}
+				for i in group:
+					source, line = records[i].split("\t", 1)
+					rows[source].append(line.split("\t"))
+				groups[g]['results'] = _engineResults(rows['hcf'], rows['mclf'], rows['mcf'], sines, b1b2, introns, p)
+		kept = dict()
+		for g in groups:
+			for i in groups[g].pop('members'):
+				kept[records[i]] = [g, counts[records[i]]]
+		#entries added, removed and changed, by file and name
+		summary = {'added': 0, 'removed': 0, 'changed': 0, 'computed': len(dirty), 'kept': len(groups) - len(dirty)}
+		for source in ('hcf', 'mclf', 'mcf'):
+			before = set([r for r in old if r.startswith(source + "\t")])
+			after = set([r for r in counts if r.startswith(source + "\t")])
+			gone = set([r.split("\t")[4] for r in before - after])
+			came = set([r.split("\t")[4] for r in after - before])
+			summary['added'] += len(came - gone)
+			summary['removed'] += len(gone - came)
+			summary['changed'] += len(came & gone)
+		for filename in MAIN_PARSER_RESULTS:
+			lines = list()
+			for g in groups:
+				lines.extend(groups[g]['results'][filename])
+			lines.sort()
+			f = open(filename + '.tmp', 'w')
+			for line in lines:
+				print >> f, line
+			f.close()
+			_replace(filename + '.tmp', filename)
+		f = open(state + '.tmp', 'w')
+		json.dump({'key': key, 'records': kept, 'groups': groups}, f)
 		f.close()
-
-
-		#intersect them with human circRNA(extended since that is the consideration)
-		import pybedtools
-		hce = pybedtools.BedTool('hc_extended.bed')
-		mcfl = pybedtools.BedTool('forced_liftover_mcf_human.bed')
-		f = open('humanCircRNAfinalextended.bed', 'w')
-		print >> f, hce.intersect(mcfl, wa=True, wb=True)
+		_replace(state + '.tmp', state)
+		print repr(summary['added']) + " circRNAs were added, " + repr(summary['removed']) + " removed and " + repr(summary['changed']) + " changed since the last call; " + repr(summary['computed']) + " groups were computed and " + repr(summary['kept']) + " kept"
+		print "mcbb_nodups.bed, imcbb_unextended.bed, hcfn_nodups.bed and nlhm_final.bed are up to date"
+		return summary
+
+
+#the journal mainParser keeps in the current directory of the stages it has completed
+MAIN_PARSER_JOURNAL = 'mainParser_journal.json'
+
+
+#the reads started by _prefetch(), by absolute file name, with the process that started them
+_PREFETCHED = dict()
+
+
+def _prefetch(parsed, paged, workers=6):
+	''' Starts reading every file at once in a pool of threads.  The lines of the files in parsed are held for _bedLines(), and the files in paged, which only bedtools reads, are read through once so bedtools finds them in the page cache. '''
+	from multiprocessing.pool import ThreadPool
+	pool = ThreadPool(max(1, min(workers, len(parsed) + len(paged))))
+	for filename in parsed:
+		if filename != null and _prefetched(filename) == null:
+			_PREFETCHED[os.path.abspath(filename)] = (os.getpid(), pool.apply_async(_readLines, (filename,)))
+	for filename in paged:
+		if filename != null:
+			pool.apply_async(_pageThrough, (filename,))
+	#the threads exit once their reads are done
+	pool.close()
+
+
+def _prefetched(filename):
+	''' Returns the read of filename started by _prefetch() in this process, or None '''
+	pending = _PREFETCHED.get(os.path.abspath(filename))
+	if pending == null or pending[0] != os.getpid():
+		return null
+	return pending[1]
+
+
+def _pageThrough(filename):
+	''' Reads a file through once, so that it is in the page cache for the next reader '''
+	with open(filename, 'rb') as f:
+		while f.read(1 << 24):
+			pass
+
+
+def _readWords(filename):
+	''' Reads every field of a tab separated file into one flat list, the way the stages of mainParser slice their input into columns '''
+	words = list()
+	for line in _bedLines(filename):
+		words.extend(_splitLine(line))
+	return words
+
+
+#the memory budget of each step of mainParser in bytes, set from its memory_limit for the length of a call; None for no budget
+_MEMORY_LIMIT = null
+#the bytes of memory a file is taken to need per byte on disk once it is read into a list of words
+_WORDS_PER_BYTE = 8
+#the bytes of text a compressed bed file is taken to hold per byte on disk
+_INFLATION = 4
+
+
+def _parseSize(size):
+	''' Returns a memory size in bytes from a number of bytes or a string such as '512M' or '4G' '''
+	if isinstance(size, basestring):
+		units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+		size = size.strip().upper()
+		if size.endswith('B'):
+			size = size[:-1]
+		if size[-1:] in units:
+			return int(float(size[:-1]) * units[size[-1]])
+	return int(size)
+
+
+def _overBudget(filename):
+	''' Returns True when reading filename whole would take more memory than _MEMORY_LIMIT; a compressed file is taken to hold _INFLATION times its size in text '''
+	if _MEMORY_LIMIT == null:
+		return False
+	size = os.path.getsize(filename)
+	if _isCompressed(filename):
+		size *= _INFLATION
+	return size * _WORDS_PER_BYTE > _MEMORY_LIMIT
+
+
+def _rows(filename, width):
+	''' Yields the rows of width words of a file, the way the stages of mainParser slice their input into columns.  Within the memory budget the words are read all at once, and beyond it they are streamed a line at a time. '''
+	if _overBudget(filename):
+		row = list()
+		for line in _bedLines(filename):
+			for word in _splitLine(line):
+				row.append(word)
+				if len(row) == width:
+					yield row
+					row = list()
+		return
+	words = _readWords(filename)
+	for i in range(0, len(words) // width * width, width):
+		yield words[i:i + width]
+
+
+def _shiftColumns(outfile, infile, width, shifts):
+	''' Writes infile to outfile with each column number in shifts moved by its amount, leaving chromStart/chromEnd header values alone '''
+	f = _openOutput(outfile)
+	for row in _rows(infile, width):
+		for column in shifts:
+			if row[column] != 'chromStart' and row[column] != 'chromEnd':
+				row[column] = repr(int(row[column]) + shifts[column])
+		print >> f, "\t".join(row)
+	f.close()
+
+
+def _pickColumns(outfile, infile, width, columns):
+	''' Writes the given column numbers of every row of infile to outfile '''
+	f = _openOutput(outfile)
+	for row in _rows(infile, width):
+		print >> f, "\t".join([row[column] for column in columns])
+	f.close()
+
+
+def _intersect(outfile, a, b, wb):
+	''' Writes the rows of a that overlap b, once per overlap, with the row of b appended when wb is True '''
+	#bedtools is only needed by the steps that intersect, so it is imported here
+	import pybedtools
+	if wb:
+		result = pybedtools.BedTool(a).intersect(pybedtools.BedTool(b), wa=True, wb=True)
+	else:
+		result = pybedtools.BedTool(a).intersect(pybedtools.BedTool(b), wa=True)
+	f = _openOutput(outfile)
+	if isinstance(getattr(result, 'fn', null), basestring) and os.path.exists(result.fn) and _overBudget(result.fn):
+		#copied over from the file bedtools wrote instead of being read into one string
+		import shutil
+		with open(result.fn) as bed:
+			shutil.copyfileobj(bed, f, 1 << 20)
+		print >> f
+	else:
+		print >> f, result
+	f.close()
+
+
+def _dedup(outfile, infile):
+	''' Writes the sorted unique lines of infile to outfile '''
+	#within a memory budget, sort spills to temporary files once its buffer is full
+	buffer = "" if _MEMORY_LIMIT == null else "-S " + repr(max(_MEMORY_LIMIT // 2048, 1024)) + "K "
+	#gzip -dcf reads plain and compressed files alike
+	command = "gzip -dcf '" + infile + "' | sort " + buffer + "| uniq"
+	if _COMPRESSION == null:
+		if os.system(command + " > '" + outfile + "'") != 0:
+			raise OSError('sort | uniq failed on ' + infile)
+		return
+	import shutil
+	import subprocess
+	process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE)
+	f = _openOutput(outfile)
+	shutil.copyfileobj(process.stdout, f, 1 << 20)
+	f.close()
+	if process.wait() != 0:
+		raise OSError('sort | uniq failed on ' + infile)
+
+
+def _copyRows(outfile, infile):
+	''' Writes the lines of infile to outfile '''
+	f = _openOutput(outfile)
+	for line in _bedLines(infile):
+		print >> f, line
+	f.close()
+
+
+def _flankedRows(outfile, infile, flanked):
+	''' Writes the sorted unique rows of the bed12 file infile that are also rows of flanked, as _dedup() writes them '''
+	rows = set(_bedLines(flanked))
+	f = _openOutput(outfile + '.rows')
+	for row in _rows(infile, 12):
+		line = "\t".join(row)
+		if line in rows:
+			print >> f, line
+	f.close()
+	try:
+		_dedup(outfile, outfile + '.rows')
+	finally:
+		os.remove(outfile + '.rows')
+
+
+#the version of the layout of the bundles of _humanBundle(), part of their names so that a bundle of another version is built again rather than read
+HUMAN_BUNDLE_VERSION = 1
+
+
+def _humanBundle(directory, hcf, hrsinef, extend_sine, extend_circRNA):
+	''' Returns the directory of the human bundle of hcf and hrsinef for extend_sine and extend_circRNA within directory, building it first if there is none, see DataParser.humanBundle().
+		start_flanked.bed and end_flanked.bed are built by the same steps that mainParser runs on hcf_elmcf.bed, here run on all of hcf, so a row of hcf_elmcf.bed is in hesu_nodups.bed (heeu_nodups.bed) exactly when it is a row of start_flanked.bed (end_flanked.bed).
+	'''
+	import hashlib
+	import shutil
+	hashes = dict()
+	key = {'version': HUMAN_BUNDLE_VERSION, 'hcf': _fileHash(hcf, hashes), 'hrsinef': _fileHash(hrsinef, hashes), 'extend_sine': extend_sine, 'extend_circRNA': extend_circRNA}
+	bundle = os.path.join(directory, 'es' + repr(extend_sine) + '_ec' + repr(extend_circRNA) + '_' + hashlib.md5(json.dumps(key, sort_keys=True)).hexdigest()[:16])
+	if os.path.exists(os.path.join(bundle, 'bundle.json')):
+		return bundle
+	if not os.path.isdir(directory):
+		os.makedirs(directory)
+	#built under a temporary name and renamed once complete, so a bundle that exists is whole
+	building = bundle + '.' + repr(os.getpid()) + '.tmp'
+	if os.path.isdir(building):
+		shutil.rmtree(building)
+	os.makedirs(building)
+	def path(name):
+		return os.path.join(building, name)
+	try:
+		_shiftColumns(path('hc_extended.bed'), hcf, 12, {1: -extend_circRNA, 2: extend_circRNA})
+		for side, extend in (('start', {1: -extend_sine}), ('end', {2: extend_sine})):
+			_shiftColumns(path(side + '_extended.bed'), hcf, 12, extend)
+			_intersect(path(side + '_sine.bed'), path(side + '_extended.bed'), hrsinef, False)
+			_shiftColumns(path(side + '_unextended.bed'), path(side + '_sine.bed'), 12, dict([(column, -extend[column]) for column in extend]))
+			_dedup(path(side + '_flanked.bed'), path(side + '_unextended.bed'))
+			for name in ('_extended.bed', '_sine.bed', '_unextended.bed'):
+				os.remove(path(side + name))
+		manifest = dict(key)
+		manifest['files'] = dict([(name, _fileHash(path(name), hashes)) for name in ('hc_extended.bed', 'start_flanked.bed', 'end_flanked.bed')])
+		f = open(path('bundle.json'), 'w')
+		json.dump(manifest, f, indent=1, sort_keys=True)
 		f.close()
-
-		#unextend human circRNAs
-		database = list()
-		with open('humanCircRNAfinalextended.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-		chroms = database[0::12]
-		starts = database[1::12]
-		ends = database[2::12]
-		names = database[3::12]
-		datab1 = database[4::12]
-		datab2 = database[5::12]
-		datab3 = database[6::12]
-		datab4 = database[7::12]
-		datab5 = database[8::12]
-		datab6 = database[9::12]
-		datab7 = database[10::12]
-		datab8 = database[11::12]
-		starts2 = list()
-		ends2 = list()
-		for x in starts:
-			one_start = x
-			if one_start !='chromStart':
-				one_start = int(x)
-				one_start = one_start + extend_circRNA
-			starts2.append(one_start)
-
-
-		for x in ends:
-			one_end = x
-			if one_end != 'chromEnd':
-				one_end = int(x)
-				one_end = one_end - extend_circRNA
-			ends2.append(one_end)
-
-
-		f = open('hcf_normal.bed', 'w')
-		for i in range(len(chroms)):
-			print >> f, chroms[i] + "\t" + repr(starts2[i]) + "\t" + repr(ends2[i]) + "\t" + names[i] + "\t" + datab1[i] + "\t" + datab2[i] + "\t" + datab3[i] + "\t" + datab4[i] + "\t" + datab5[i] + "\t" + datab6[i] + "\t" + datab7[i] + "\t" + datab8[i]
-
-
+		try:
+			os.rename(building, bundle)
+		except OSError:
+			#another process finished the same bundle first
+			if not os.path.exists(os.path.join(bundle, 'bundle.json')):
+				raise
+	finally:
+		if os.path.isdir(building):
+			shutil.rmtree(building)
+	return bundle
+
+
+def _forceLiftover(outfile, infile, width, source, paired):
+	''' Replaces every row of infile by the rows of the bed12 file source with the same name.  When paired is True, only the first four columns are replaced and the human columns of infile are kept. '''
+	if _overBudget(source):
+		_spilledLiftover(outfile, infile, width, source, paired)
+		return
+	table = _bedTable(source)
+	by_code = table.byCode()
+	f = _openOutput(outfile)
+	for row in _rows(infile, width):
+		for j in by_code.get(table.name_symbols.find(row[3]), []):
+			if paired:
+				print >> f, "\t".join(table[j][:4] + row[4:8])
+			else:
+				print >> f, table.lines[j]
+	f.close()
+
+
+def _spilledLiftover(outfile, infile, width, source, paired):
+	''' _forceLiftover() for a source beyond the memory budget.  The rows of source and infile are spilled by name into gzip compressed partitions small enough to join one at a time, and the joined rows are merged back into the order of infile. '''
+	import gzip
+	import heapq
+	import shutil
+	import tempfile
+	parts = int(os.path.getsize(source) * _WORDS_PER_BYTE // _MEMORY_LIMIT) + 1
+	spill = tempfile.mkdtemp(prefix='hcrdp_spill_', dir='.')
+	def partition(kind, k, mode):
+		return gzip.open(os.path.join(spill, kind + repr(k) + '.gz'), mode)
+	try:
+		files = [partition('source', k, 'wb') for k in range(parts)]
+		for line in _bedLines(source):
+			fields = _splitLine(line)
+			#as in BedTable, header rows and rows without a name are never joined
+			if len(fields) < 4 or fields[1:2] == ['chromStart'] or fields[1:2] == ["'chromStart'"]:
+				continue
+			files[hash(fields[3]) % parts].write(line + "\n")
+		for f in files:
+			f.close()
+		#each row of infile keeps its number and the words the join needs
+		files = [partition('rows', k, 'wb') for k in range(parts)]
+		for i, row in enumerate(_rows(infile, width)):
+			files[hash(row[3]) % parts].write("\t".join([repr(i)] + row[3:8 if paired else 4]) + "\n")
+		for f in files:
+			f.close()
+		for k in range(parts):
+			by_name = dict()
+			for line in partition('source', k, 'rb'):
+				line = line[:-1]
+				by_name.setdefault(_splitLine(line)[3], list()).append(line)
+			out = partition('joined', k, 'wb')
+			for line in partition('rows', k, 'rb'):
+				fields = line[:-1].split("\t")
+				for match in by_name.get(fields[1], []):
+					if paired:
+						match = "\t".join(_splitLine(match)[:4] + fields[2:6])
+					out.write(fields[0] + "\t" + match + "\n")
+			out.close()
+		def joined(k):
+			#the row number, then the place within the partition to keep the matches of a row in order
+			for n, line in enumerate(partition('joined', k, 'rb')):
+				number, match = line[:-1].split("\t", 1)
+				yield int(number), n, match
+		f = _openOutput(outfile)
+		for number, n, match in heapq.merge(*[joined(k) for k in range(parts)]):
+			print >> f, match
 		f.close()
-		#more duplicates
-		os.system("cat 'hcf_normal.bed' | sort | uniq > hcfn_nodups.bed")
-
-		# get the data lined up side by side
-		hce = pybedtools.BedTool('hc_extended.bed')
-		mcfl = pybedtools.BedTool('forced_liftover_mcf_human.bed')
-		f = open('hcrpm.bed', 'w')
-		print >> f, mcfl.intersect(hce, wa=True, wb=True)
+	finally:
+		shutil.rmtree(spill, True)
+
+
+def _filterPairs(outfile, infile, low, high):
+	''' Writes the side by side rows of infile whose start and end differences fall between low and high '''
+	f = _openOutput(outfile)
+	for row in _rows(infile, 8):
+		x = int(row[1]) - int(row[5])
+		y = int(row[2]) - int(row[6])
+		if low <= x <= high and low <= y <= high:
+			print >> f, "\t".join(row)
+	f.close()
+
+
+def _expandNames(outfile, infile):
+	''' Writes every row of a four column file once per comma separated name in its name column '''
+	f = _openOutput(outfile)
+	for row in _rows(infile, 4):
+		for name in row[3].split(","):
+			print >> f, row[0] + "\t" + row[1] + "\t" + row[2] + "\t" + name
+	f.close()
+
+
+def _bandedJoin(lifted, human, low, high, extend_circRNA=None):
+	''' Pairs every lifted row with the human rows on the same chromosome whose start and end differences (lifted minus human) both lie between low and high.
+		The human rows are sorted by start on each chromosome, so the candidates for a lifted row are found by binary search on the start window and only their ends are compared.
+		With extend_circRNA, a pair must also overlap once the human row is extended by it, as the bedtools intersect of mainParser requires.
+	
+	:param lifted: the lifted rows of the genome of interest
+	:type lifted: list or BedTable
+	:param human: the human rows
+	:type human: list or BedTable
+	:returns: list of (lifted row, human row, start difference, end difference), each distinct pair of rows once, in lifted chromosome and start order
+	'''
+	#the human rows are held by number and only split out once they pair
+	by_chrom = dict()
+	for k, (chrom, start, end) in enumerate(_coords(human)):
+		by_chrom.setdefault(chrom, list()).append((start, end, k))
+	for chrom in by_chrom:
+		by_chrom[chrom].sort()
+	starts = dict([(chrom, [x[0] for x in by_chrom[chrom]]) for chrom in by_chrom])
+	pairs = list()
+	seen = set()
+	coords = _coords(lifted)
+	for i in sorted(range(len(coords)), key=lambda i: coords[i][:2]):
+		chrom, ls, le = coords[i]
+		if chrom not in by_chrom:
+			continue
+		row = null
+		entries = by_chrom[chrom]
+		lo = bisect.bisect_left(starts[chrom], ls - high)
+		hi = bisect.bisect_right(starts[chrom], ls - low)
+		for hs, he, k in [entries[k] for k in range(lo, hi) if low <= le - entries[k][1] <= high]:
+			if extend_circRNA != null and not (ls < he + extend_circRNA and hs - extend_circRNA < le):
+				continue
+			if row == null:
+				row = lifted[i]
+			match = human[k]
+			key = (tuple(row), tuple(match))
+			if key in seen:
+				continue
+			seen.add(key)
+			pairs.append((row, match, ls - hs, le - he))
+	return pairs
+
+
+def _bandedPairs(outfile, liftedfile, humanfile, low, high, extend_circRNA):
+	''' Writes the side by side rows of _bandedJoin() in the layout of narrow_list_human_mouse.bed '''
+	f = _openOutput(outfile)
+	for row, match, start_delta, end_delta in _bandedJoin(BedTable(liftedfile), _bedTable(humanfile), low, high, extend_circRNA):
+		print >> f, "\t".join(row[:4] + match[:4])
+	f.close()
+
+
+class RepeatDistanceIndex(object):
+	''' Per-chromosome arrays of repeat starts with a running maximum of their ends, and of repeat ends with a running minimum of their starts, so the nearest repeat on either side of any interval is found with two bisects.
+	
+	:param repeats: the repeat rows, with the chromosome, start and end in the first three columns
+	:type repeats: list
+	'''
+	def __init__(self, repeats):
+		by_chrom = dict()
+		for repeat in repeats:
+			by_chrom.setdefault(repeat[0], list()).append((int(repeat[1]), int(repeat[2])))
+		self.starts = dict()
+		self.reach = dict()
+		self.ends = dict()
+		self.nearest = dict()
+		for chrom in by_chrom:
+			entries = sorted(by_chrom[chrom])
+			self.starts[chrom] = [x[0] for x in entries]
+			self.reach[chrom] = list()
+			furthest = null
+			for x in entries:
+				if furthest == null or x[1] > furthest:
+					furthest = x[1]
+				self.reach[chrom].append(furthest)
+			entries.sort(key=lambda x: x[1])
+			self.ends[chrom] = [x[1] for x in entries]
+			self.nearest[chrom] = [0] * len(entries)
+			closest = null
+			for k in range(len(entries) - 1, -1, -1):
+				if closest == null or entries[k][0] < closest:
+					closest = entries[k][0]
+				self.nearest[chrom][k] = closest
+	def distances(self, chrom, start, end):
+		''' Returns the distance from start back to the furthest reaching end of the repeats that start before end, and the distance from end on to the nearest start of the repeats that end after start, None where a side has no repeat.
+			chrom:start-end is flanked within extend_sine, in the sense of mainParser, exactly when both are below extend_sine.
+		
+		:rtype: tuple
+		'''
+		upstream = null
+		downstream = null
+		if chrom in self.starts:
+			k = bisect.bisect_left(self.starts[chrom], end)
+			if k > 0:
+				upstream = start - self.reach[chrom][k - 1]
+			k = bisect.bisect_right(self.ends[chrom], start)
+			if k < len(self.ends[chrom]):
+				downstream = self.nearest[chrom][k] - end
+		return upstream, downstream
+	def flanked(self, chrom, start, end, extend_sine):
+		''' Returns True if a repeat lies within extend_sine of both sides of chrom:start-end '''
+		upstream, downstream = self.distances(chrom, start, end)
+		return upstream != null and downstream != null and upstream < extend_sine and downstream < extend_sine
+
+
+class IntronPairIndex(object):
+	''' Per-chromosome arrays of intron ends and of intron starts, each sorted, so the introns bordering the back-splice junction of a circRNA are found by binary search: the intron ending at its start (on the lower coordinate side) and the intron starting at its end (on the higher coordinate side).
+	
+	:param introns: the intron rows as saved by exonToIntron(), chromosome, start, end and the transcript name (or comma separated names, when collapsed)
+	:type introns: list
+	'''
+	def __init__(self, introns):
+		self.rows = introns
+		by_chrom = dict()
+		for i in range(len(introns)):
+			by_chrom.setdefault(introns[i][0], list()).append((int(introns[i][1]), int(introns[i][2]), i))
+		self.ends = dict()
+		self.by_end = dict()
+		self.starts = dict()
+		self.by_start = dict()
+		for chrom in by_chrom:
+			entries = sorted(by_chrom[chrom], key=lambda x: (x[1], x[2]))
+			self.ends[chrom] = [x[1] for x in entries]
+			self.by_end[chrom] = [x[2] for x in entries]
+			entries.sort()
+			self.starts[chrom] = [x[0] for x in entries]
+			self.by_start[chrom] = [x[2] for x in entries]
+	def _near(self, positions, ids, position, tolerance):
+		lo = bisect.bisect_left(positions, position - tolerance)
+		hi = bisect.bisect_right(positions, position + tolerance)
+		return [(abs(positions[k] - position), ids[k]) for k in range(lo, hi)]
+	def flanking(self, chrom, start, end, extend_intron):
+		''' Returns the intron ending within extend_intron of start and the intron starting within extend_intron of end, each as its row number or None.
+			Of the candidates, a pair from a common transcript is preferred, then the pair closest to the junction.
+		
+		:rtype: tuple
+		'''
+		if chrom not in self.ends:
+			return null, null
+		before = self._near(self.ends[chrom], self.by_end[chrom], start, extend_intron)
+		after = self._near(self.starts[chrom], self.by_start[chrom], end, extend_intron)
+		best = null
+		for distance, i in before or [(0, null)]:
+			for other, j in after or [(0, null)]:
+				shared = i != null and j != null and bool(set(self.rows[i][3].split(",")) & set(self.rows[j][3].split(",")))
+				key = (not shared, distance + other)
+				if best == null or key < best[0]:
+					best = (key, i, j)
+		return best[1], best[2]
+
+
+def _nearestRepeats(rows, repeats):
+	''' Returns RepeatDistanceIndex.distances() for every row
+	
+	:param rows: rows with the chromosome, start and end in the first three columns
+	:type rows: list
+	:param repeats: the repeat rows
+	:type repeats: list
+	:returns: list of (start side distance, end side distance), None where a side has no repeat
+	'''
+	index = RepeatDistanceIndex(repeats)
+	return [index.distances(row[0], int(row[1]), int(row[2])) for row in rows]
+
+
+def _writeRepeatDistances(outfile, circfile, repeatfile):
+	''' Writes the first four columns of every circRNA followed by its _nearestRepeats() distances '''
+	rows = _readBed(circfile)
+	f = open(outfile, 'w')
+	for row, (upstream, downstream) in zip(rows, _nearestRepeats(rows, _readBed(repeatfile))):
+		print >> f, "\t".join(row[:4] + ['.' if upstream == null else repr(upstream), '.' if downstream == null else repr(downstream)])
+	f.close()
+
+
+#what the permutation workers share, set before the pool is forked so it is not pickled for every task
+_PERMUTATION_STATE = dict()
+
+
+def _permutationCounts(seeds):
+	''' Places every circRNA of the shared state at random once per seed and returns how many placements are flanked for each seed.
+		With numpy the placements of each chromosome are drawn and tested as arrays, see _batchedCounts(), otherwise one circRNA at a time.
+	'''
+	try:
+		import numpy
+	except ImportError:
+		numpy = null
+	if numpy != null:
+		return _batchedCounts(numpy, seeds)
+	import random
+	circRNAs = _PERMUTATION_STATE['circRNAs']
+	sizes = _PERMUTATION_STATE['sizes']
+	gaps = _PERMUTATION_STATE['gaps']
+	repeats = _PERMUTATION_STATE['repeats']
+	extend_sine = _PERMUTATION_STATE['extend_sine']
+	counts = list()
+	for seed in seeds:
+		generator = random.Random(seed)
+		count = 0
+		for chrom, length in circRNAs:
+			for attempt in range(1000):
+				start = generator.randint(0, sizes[chrom] - length)
+				if gaps == null or not gaps.anyOverlap(chrom, start, start + length):
+					break
+			else:
+				raise ValueError('could not place a circRNA of length ' + repr(length) + ' on ' + chrom + ' outside of the gaps')
+			if repeats.flanked(chrom, start, start + length, extend_sine):
+				count = count + 1
+		counts.append(count)
+	return counts
+
+
+def _batchedCounts(numpy, seeds):
+	''' _permutationCounts() over numpy arrays: for each seed and chromosome, all of the starts are drawn at once, the ones overlapping a gap are drawn again together, and the flank test of RepeatDistanceIndex.flanked() runs as two searchsorted calls '''
+	sizes = _PERMUTATION_STATE['sizes']
+	gaps = _PERMUTATION_STATE['gaps']
+	repeats = _PERMUTATION_STATE['repeats']
+	extend_sine = _PERMUTATION_STATE['extend_sine']
+	lengths = dict()
+	for chrom, length in _PERMUTATION_STATE['circRNAs']:
+		lengths.setdefault(chrom, list()).append(length)
+	chroms = sorted(lengths)
+	#the arrays of each chromosome are built once for all of the seeds
+	tables = dict()
+	for chrom in chroms:
+		length = numpy.array(lengths[chrom], dtype=numpy.int64)
+		table = {'length': length, 'spans': sizes[chrom] - length + 1, 'gaps': null, 'repeats': null}
+		if gaps != null and chrom in gaps.starts:
+			table['gaps'] = (numpy.array(gaps.starts[chrom], dtype=numpy.int64), numpy.maximum.accumulate(numpy.array(gaps.ends[chrom], dtype=numpy.int64)))
+		if chrom in repeats.starts:
+			table['repeats'] = [numpy.array(values, dtype=numpy.int64) for values in (repeats.starts[chrom], repeats.reach[chrom], repeats.ends[chrom], repeats.nearest[chrom] + [0])]
+		tables[chrom] = table
+	counts = list()
+	for seed in seeds:
+		generator = numpy.random.RandomState(seed % (1 << 32))
+		count = 0
+		for chrom in chroms:
+			table = tables[chrom]
+			length = table['length']
+			spans = table['spans']
+			starts = (generator.random_sample(len(length)) * spans).astype(numpy.int64)
+			if table['gaps'] != null:
+				gap_starts, gap_reach = table['gaps']
+				for attempt in range(1000):
+					k = numpy.searchsorted(gap_starts, starts + length, 'left')
+					again = numpy.flatnonzero((k > 0) & (gap_reach[numpy.maximum(k - 1, 0)] > starts))
+					if len(again) == 0:
+						break
+					starts[again] = (generator.random_sample(len(again)) * spans[again]).astype(numpy.int64)
+				else:
+					raise ValueError('could not place a circRNA of length ' + repr(int(length[again[0]])) + ' on ' + chrom + ' outside of the gaps')
+			if table['repeats'] == null:
+				continue
+			repeat_starts, reach, repeat_ends, nearest = table['repeats']
+			ends = starts + length
+			k = numpy.searchsorted(repeat_starts, ends, 'left')
+			upstream = starts - reach[numpy.maximum(k - 1, 0)]
+			j = numpy.searchsorted(repeat_ends, starts, 'right')
+			downstream = nearest[j] - ends
+			count = count + int(((k > 0) & (upstream < extend_sine) & (j < len(repeat_ends)) & (downstream < extend_sine)).sum())
+		counts.append(count)
+	return counts
+
+
+def flankEnrichment(circfile, repeatfile, genome, extend_sine=2000, permutations=1000, gaps=None, processes=1, seed=0):
+	''' Tests whether more circRNAs are flanked by repeats on both sides than chance would give, by placing the circRNA set at random many times and counting how often the random placements are flanked at least as often as the real ones.
+		Every circRNA keeps its length and chromosome and is placed uniformly on that chromosome, outside of the gaps.  Permutation i uses the seed seed * 1000003 + i, so the result does not depend on the number of processes.
+		With numpy installed each permutation is drawn and tested as arrays, one chromosome at a time; without it the circRNAs are placed one by one, with other random draws for the same seed.  CircRNAs on a chromosome missing from genome or longer than their chromosome are left out and counted in 'skipped'.
+	
+	:param circfile: the name of the bed file of circRNAs to test, e.g. forced_liftover_mcss.bed against mrb1b2f or hcf against hrsinef
+	:type circfile: string
+	:param repeatfile: the name of the bed file of repeats
+	:type repeatfile: string
+	:param genome: the name of a file of chromosome sizes, one "chrom<tab>size" per line as for bedtools shuffle -g
+	:type genome: string
+	:param extend_sine: the number of nt that is the max distance away from the circRNA for a repeat to be considered flanking (default 2000)
+	:type extend_sine: int
+	:param permutations: the number of random placements of the set (default 1000)
+	:type permutations: int
+	:param gaps: Optional string naming a bed file of regions random placements must avoid, such as assembly gaps (default None)
+	:type gaps: string
+	:param processes: the number of processes to spread the permutations over (default 1)
+	:type processes: int
+	:param seed: the seed of the run (default 0)
+	:type seed: int
+	:returns: a dictionary with the observed count, the number of circRNAs tested and skipped, the counts of every permutation, their mean and the empirical p-value (1 + permutations at or above observed) / (1 + permutations)
+	'''
+	sizes = dict()
+	for line in _iterBed(genome):
+		if len(line) >= 2:
+			sizes[line[0]] = int(line[1])
+	rows = list()
+	skipped = 0
+	for row in _readBed(circfile):
+		#a circRNA on a chromosome missing from genome, or longer than its chromosome, has nowhere to be placed
+		if row[0] not in sizes or int(row[2]) - int(row[1]) > sizes[row[0]]:
+			skipped = skipped + 1
+		else:
+			rows.append(row)
+	if skipped > 0:
+		print repr(skipped) + " circRNAs of " + circfile + " are on chromosomes missing from " + genome + " or longer than their chromosome, and are left out of the test"
+	repeats = RepeatDistanceIndex(_readBed(repeatfile))
+	observed = len([row for row in rows if repeats.flanked(row[0], int(row[1]), int(row[2]), extend_sine)])
+	_PERMUTATION_STATE.update({'circRNAs': [(row[0], int(row[2]) - int(row[1])) for row in rows], 'sizes': sizes, 'gaps': IntervalIndex(_readBed(gaps)) if gaps != null else null, 'repeats': repeats, 'extend_sine': extend_sine})
+	seeds = [seed * 1000003 + i for i in range(permutations)]
+	try:
+		if processes <= 1:
+			counts = _permutationCounts(seeds)
+		else:
+			import multiprocessing
+			pool = multiprocessing.Pool(processes)
+			try:
+				chunks = pool.map(_permutationCounts, [seeds[k::processes] for k in range(processes)])
+			finally:
+				pool.terminate()
+			#put the counts back in seed order
+			counts = [0] * permutations
+			for k in range(processes):
+				counts[k::processes] = chunks[k]
+	finally:
+		_PERMUTATION_STATE.clear()
+	above = len([count for count in counts if count >= observed])
+	return {'observed': observed, 'total': len(rows), 'skipped': skipped, 'counts': counts, 'expected': float(sum(counts)) / max(permutations, 1), 'p_value': (1.0 + above) / (1.0 + permutations)}
+
+
+
+def _parameterDict(extend_sine, extend_circRNA, extend_intron, comp_distance_buffer_high, comp_distance_buffer_low):
+	''' Returns the five parameters of mainParser as one dictionary, by name '''
+	return {'extend_sine': extend_sine, 'extend_circRNA': extend_circRNA, 'extend_intron': extend_intron, 'comp_distance_buffer_high': comp_distance_buffer_high, 'comp_distance_buffer_low': comp_distance_buffer_low}
+
+
+def _fileHash(filename, hashes):
+	''' Returns the md5 of a file, caching it in hashes by name '''
+	if filename not in hashes:
+		import hashlib
+		md5 = hashlib.md5()
+		with open(filename, 'rb') as f:
+			for block in iter(lambda: f.read(1 << 20), ''):
+				md5.update(block)
+		hashes[filename] = md5.hexdigest()
+	return hashes[filename]
+
+
+def _replace(tmp, filename):
+	''' Renames tmp over filename, which is atomic on POSIX '''
+	try:
+		os.rename(tmp, filename)
+	except OSError:
+		os.remove(filename)
+		os.rename(tmp, filename)
+
+
+#the _Progress of the exonToIntron or mainParser call under way, if it reports its progress
+_PROGRESS = null
+#the _Counter of the stage each thread is running, if any
+_COUNTING = threading.local()
+
+
+class _Counter(object):
+	''' The rows and bytes of text one stage has read, added to by _counted() a block of lines at a time '''
+	def __init__(self):
+		self.rows = 0
+		self.bytes_read = 0
+
+
+def _counting(output):
+	''' Makes the counter of the stage writing output, taken from _PROGRESS when there is one, the counter of this thread, and returns it '''
+	_COUNTING.counter = _PROGRESS.counter(output) if _PROGRESS != null else _Counter()
+	return _COUNTING.counter
+
+
+def _counted(rows, size):
+	''' Adds rows and size bytes read to the counter of this thread's stage; called once per block of lines, never per row '''
+	counter = getattr(_COUNTING, 'counter', null)
+	if counter != null:
+		counter.rows += rows
+		counter.bytes_read += size
+
+
+def _inputSize(filename):
+	''' Returns the bytes of text filename is taken to hold, or 0 if it does not exist yet '''
+	if not os.path.isfile(filename):
+		return 0
+	size = os.path.getsize(filename)
+	if size and _isCompressed(filename):
+		size *= _INFLATION
+	return size
+
+
+def _sizeOf(filename):
+	''' Returns the size of filename, or 0 if it does not exist (or was just renamed) '''
+	try:
+		return os.path.getsize(filename)
+	except OSError:
+		return 0
+
+
+def _reporting(call, outputs, progress, interval, run):
+	''' Calls run() with a _Progress of call as _PROGRESS, returning what it returns '''
+	global _PROGRESS
+	_PROGRESS = _Progress(call, outputs, progress, interval)
+	state = 'failed'
+	try:
+		result = run()
+		state = 'done'
+		return result
+	finally:
+		_PROGRESS.stop(state)
+		_PROGRESS = null
+
+
+def _clock(seconds):
+	''' Formats seconds as h:mm:ss '''
+	seconds = int(seconds)
+	return "%d:%02d:%02d" % (seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+class _Progress(object):
+	''' Reports the progress of the steps of an exonToIntron or mainParser call every interval seconds from a thread of its own, to standard error or as a JSON status file, until stop().
+		For each step it gives the rows and bytes read, the rows per second, the bytes written so far (the size of its output on disk) and its state.  The steps count what they read a block of lines at a time through _counted(), so the reading loops do not call back per row; bedtools and sort read outside of python, so those steps only show the bytes they have written.
+		The time left is estimated from the bytes the steps have to read: the inputs of the steps that have started, and for the steps still to come the average of those.
+	
+	:param call: the name of the call, 'exonToIntron' or 'mainParser'
+	:type call: string
+	:param outputs: the files of the steps, in order
+	:type outputs: list
+	:param target: True or '-' to write a line to standard error, or the name of the status file to rewrite
+	:type target: bool or string
+	:param interval: the seconds between reports
+	:type interval: float
+	'''
+	def __init__(self, call, outputs, target, interval):
+		import time
+		self.call = call
+		self.outputs = list(outputs)
+		self.target = target
+		self.interval = interval
+		self.began = time.time()
+		self.steps = dict([(output, {'state': 'pending'}) for output in outputs])
+		self.counters = dict()
+		self._stopped = threading.Event()
+		self._thread = threading.Thread(target=self._run)
+		self._thread.daemon = True
+		self._thread.start()
+	def counter(self, output):
+		return self.counters.setdefault(output, _Counter())
+	def start(self, output, inputs, writing=None):
+		''' Marks a step running, reading inputs and writing to writing (default output + '.tmp') '''
+		import time
+		self.counter(output)
+		self.steps[output] = {'state': 'running', 'began': time.time(), 'input_bytes': sum([_inputSize(name) for name in inputs]), 'writing': writing if writing != null else output + '.tmp'}
+	def skip(self, output, inputs):
+		self.steps[output] = {'state': 'skipped', 'input_bytes': sum([_inputSize(name) for name in inputs])}
+	def finish(self, output, counts=None):
+		''' Marks a step done, taking its counts from counts (rows, bytes read) when it ran in another process '''
+		import time
+		counter = self.counter(output)
+		if counts != null:
+			counter.rows, counter.bytes_read = counts
+		self.steps[output]['state'] = 'done'
+		self.steps[output]['ended'] = time.time()
+	def status(self):
+		''' Returns the progress of the call so far as a dict '''
+		import time
+		now = time.time()
+		steps = dict()
+		known = 0
+		started = 0
+		read = 0
+		for output in self.outputs:
+			step = dict(self.steps[output])
+			state = step['state']
+			if state != 'pending':
+				started += 1
+				known += step['input_bytes']
+			if state == 'skipped':
+				read += step['input_bytes']
+			if state in ('running', 'done'):
+				counter = self.counter(output)
+				seconds = step.get('ended', now) - step['began']
+				written = output if state == 'done' else step['writing']
+				step = {'state': state, 'rows': counter.rows, 'bytes_read': counter.bytes_read, 'bytes_written': _sizeOf(written), 'seconds': round(seconds, 3), 'rows_per_second': round(counter.rows / seconds, 1) if seconds > 0 else 0.0, 'input_bytes': step['input_bytes']}
+				read += step['input_bytes'] if state == 'done' else min(counter.bytes_read, step['input_bytes'])
+			steps[output] = step
+		pending = len(self.outputs) - started
+		total = known + (float(known) / started * pending if started else 0)
+		elapsed = now - self.began
+		eta = null
+		if read > 0 and total > 0:
+			eta = max(elapsed * (total - read) / read, 0.0)
+		return {'call': self.call, 'pid': os.getpid(), 'elapsed_seconds': round(elapsed, 3), 'eta_seconds': null if eta == null else round(eta, 1), 'steps_done': len([output for output in self.outputs if steps[output]['state'] in ('done', 'skipped')]), 'steps': len(self.outputs), 'state': 'running', 'progress': steps}
+	def report(self, state='running'):
+		''' Writes the status once '''
+		status = self.status()
+		status['state'] = state
+		if self.target is True or self.target == '-':
+			running = [output + " (" + repr(status['progress'][output]['rows']) + " rows, " + repr(status['progress'][output]['rows_per_second']) + " rows/s, " + repr(status['progress'][output]['bytes_read'] >> 20) + "MB read, " + repr(status['progress'][output]['bytes_written'] >> 20) + "MB written)" for output in self.outputs if status['progress'][output]['state'] == 'running']
+			if state == 'running':
+				line = self.call + ": " + repr(status['steps_done']) + " of " + repr(status['steps']) + " steps done"
+			else:
+				line = self.call + " " + state + ": " + repr(status['steps_done']) + " of " + repr(status['steps']) + " steps done in " + _clock(status['elapsed_seconds'])
+			if running:
+				line += ", running " + "; ".join(running)
+			if state == 'running' and status['eta_seconds'] != null:
+				line += ", about " + _clock(status['eta_seconds']) + " left"
+			print >> sys.stderr, line
+			return
+		f = open(self.target + '.tmp', 'w')
+		json.dump(status, f, indent=1, sort_keys=True)
 		f.close()
-		#duplicates
-		os.system("cat 'hcrpm.bed' | sort | uniq > hcrpm_nodups.bed")
-		#code to make the file/ breakpoint
-		database = list()
-		with open('hcrpm_nodups.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-		mchroms = database[0::24]
-		mstarts = database[1::24]
-		mends = database[2::24]
-		mnames = database[3::24]
-		hchroms = database[12::24]
-		hstarts = database[13::24]
-		hends = database[14::24]
-		hnames = database[15::24]
-		f = open('cofmv.bed', 'w')
-		for i in range(len(mchroms)):
-			print >> f, mchroms[i] + "\t" + mstarts[i] + "\t" + mends[i] + "\t" + mnames[i] + "\t" + hchroms[i] + "\t" + hstarts[i] + "\t" + hends[i] + "\t" + hnames[i]
-
-
+		_replace(self.target + '.tmp', self.target)
+	def _run(self):
+		while not self._stopped.wait(self.interval):
+			self.report()
+	def stop(self, state='done'):
+		''' Stops the reports, writing a last one with state, 'done' or 'failed' '''
+		self._stopped.set()
+		self._thread.join()
+		self.report(state)
+
+
+#stage functions that spend their time in python rather than in bedtools or sort, run in a process pool when stages run in parallel
+_PROCESS_STAGES = (_shiftColumns, _pickColumns, _forceLiftover, _filterPairs, _bandedPairs, _copyRows)
+
+
+def _callStage(function, outfile, args):
+	''' Runs one stage function in a worker, returning None or the formatted traceback so a failure reaches the scheduler, with the rows and bytes the stage read '''
+	counter = _counting(outfile[:-len('.tmp')])
+	try:
+		function(outfile, *args)
+	except Exception:
+		import traceback
+		return traceback.format_exc(), counter.rows, counter.bytes_read
+	finally:
+		_COUNTING.counter = null
+	return null, counter.rows, counter.bytes_read
+
+
+def _runStages(stages, parameters, journal, resume, workers=1, prefetch=None, timings=None):
+	''' Runs the stages listed by DataParser._mainParserStages().
+		Every output is written to a temporary file and renamed once complete, then recorded in the journal with the md5 of its inputs and of itself and the parameters it used.
+		With resume, a stage is skipped when the journal shows it complete with the same inputs, parameters and output and none of the stages it reads from had to run again.
+		With more than one worker, the dependencies between stages are taken from their input and output files and up to workers independent stages run at the same time, bedtools and sort stages in a thread pool and the others in a process pool.  Each stage writes only its own file, so the outputs do not depend on the order stages finish in.
+		prefetch, if given, is called before the first stage runs and after the process pool is forked.  timings, if given, is filled with the seconds from the start to the end of each stage that ran, by output file.
+	'''
+	recorded = dict()
+	import time
+	if resume and os.path.exists(journal):
+		with open(journal) as f:
+			recorded = json.load(f)['stages']
+	hashes = dict()
+	completed = dict()
+	producers = dict([(stages[i][0], i) for i in range(len(stages))])
+	depends = [set([producers[name] for name in stage[1] if name in producers]) for stage in stages]
+	rerun = set()
+	def used(i):
+		return dict([(name, parameters[name]) for name in stages[i][2]])
+	def current(i):
+		output, inputs = stages[i][0], stages[i][1]
+		record = recorded.get(output)
+		if record != null and not (depends[i] & rerun) and os.path.exists(output) and record['parameters'] == used(i) and record['output'] == _fileHash(output, hashes) and record['inputs'] == dict([(name, _fileHash(name, hashes)) for name in inputs]):
+			if _PROGRESS != null:
+				_PROGRESS.skip(output, inputs)
+			return True
+		return False
+	began = dict()
+	def start(i):
+		if resume and not rerun:
+			print "Resuming mainParser at " + stages[i][0]
+		rerun.add(i)
+		began[i] = time.time()
+		if _PROGRESS != null:
+			_PROGRESS.start(stages[i][0], stages[i][1])
+	def finish(i, counts=None):
+		output, inputs = stages[i][0], stages[i][1]
+		if _PROGRESS != null:
+			_PROGRESS.finish(output, counts)
+		if timings != null:
+			timings[output] = time.time() - began[i]
+		_replace(output + '.tmp', output)
+		hashes.pop(output, None)
+		completed[output] = {'inputs': dict([(name, _fileHash(name, hashes)) for name in inputs]), 'parameters': used(i), 'output': _fileHash(output, hashes)}
+		f = open(journal + '.tmp', 'w')
+		json.dump({'stages': completed}, f, indent=1, sort_keys=True)
 		f.close()
-		#have to liftOver mouse back to mouse genome
-		database = list()
-		with open('cofmv.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-		mchroms = database[0::8]
-		mstarts = database[1::8]
-		mends = database[2::8]
-		mnames = database[3::8]
-		hchroms = database[4::8]
-		hstarts = database[5::8]
-		hends = database[6::8]
-		hnames = database[7::8]
-		data = list()
-		with open(mcf) as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					data.append(word)
-
-
-		chroms2 = data[0::12]
-		starts2 = data[1::12]
-		ends2 = data[2::12]
-		names2 = data[3::12]
-		f = open('comhvp.bed', 'w')
-		for i in range(len(mchroms)):
-			for j in range(len(chroms2)):
-				if names2[j] == mnames[i]:
-					print >> f, chroms2[j] + "\t" + starts2[j] + "\t" + ends2[j] + "\t" + names2[j] + "\t" + hchroms[i] + "\t" + hstarts[i] + "\t" + hends[i] + "\t" +  hnames[i]
-
-
+		_replace(journal + '.tmp', journal)
+	if workers <= 1:
+		if prefetch != null:
+			prefetch()
+		for i in range(len(stages)):
+			if current(i):
+				completed[stages[i][0]] = recorded[stages[i][0]]
+				continue
+			start(i)
+			_counting(stages[i][0])
+			try:
+				stages[i][3](stages[i][0] + '.tmp', *stages[i][4])
+			finally:
+				_COUNTING.counter = null
+			finish(i)
+		return
+	import Queue
+	import multiprocessing
+	from multiprocessing.pool import ThreadPool
+	#the process pool is forked before any thread is started
+	pools = {'process': multiprocessing.Pool(workers), 'thread': ThreadPool(workers)}
+	if prefetch != null:
+		prefetch()
+	finished = Queue.Queue()
+	done = set()
+	running = set()
+	pending = range(len(stages))
+	try:
+		while pending or running:
+			#start every stage whose inputs are ready, in the listed order, up to the number of workers
+			for i in list(pending):
+				if len(running) >= workers:
+					break
+				if not depends[i] <= done:
+					continue
+				pending.remove(i)
+				if current(i):
+					completed[stages[i][0]] = recorded[stages[i][0]]
+					done.add(i)
+					continue
+				start(i)
+				kind = 'process' if stages[i][3] in _PROCESS_STAGES else 'thread'
+				pools[kind].apply_async(_callStage, (stages[i][3], stages[i][0] + '.tmp', stages[i][4]), callback=lambda result, i=i: finished.put((i, result)))
+				running.add(i)
+			if not running:
+				continue
+			#a timeout keeps the wait interruptible with ctrl-c
+			i, (error, rows, bytes_read) = finished.get(True, 1 << 30)
+			running.remove(i)
+			if error != null:
+				raise RuntimeError('mainParser stage ' + stages[i][0] + ' failed:\n' + error)
+			#a stage run in the process pool counted in its own copy of the counters
+			finish(i, (rows, bytes_read))
+			done.add(i)
+	finally:
+		for pool in pools.values():
+			pool.terminate()
+
+
+def _legacyEngine(parser, eiom, p, timings, banded_join=False, workers=1):
+	''' Runs the steps of mainParser in the current directory, recording the seconds of each in timings '''
+	sources = [parser.hcf, parser.mcf, parser.mclf, parser.hrsinef, parser.mrb1b2f]
+	copies = _bedInputs(sources)
+	hcf, mcf, mclf, hrsinef, mrb1b2f = copies
+	try:
+		_runStages(parser._mainParserStages(eiom, hcf, mcf, mclf, hrsinef, mrb1b2f, p, banded_join), p, MAIN_PARSER_JOURNAL, False, workers, null, timings)
+	finally:
+		_removeBedCopies(sources, copies)
+
+
+def _memoryEngine(parser, eiom, p, timings):
+	''' Runs _engineResults() over the inputs and saves the files it computes in the current directory, recording the seconds of each in timings '''
+	import time
+	began = time.time()
+	human = _readBed(parser.hcf)
+	lifted = _readBed(parser.mclf)
+	mouse = _readBed(parser.mcf)
+	sines = _intervalIndex(parser.hrsinef)
+	b1b2 = _intervalIndex(parser.mrb1b2f)
+	introns = _intervalIndex(eiom)
+	loading = time.time() - began
+	results = _engineResults(human, lifted, mouse, sines, b1b2, introns, p, timings)
+	#the loading is counted with the first file
+	timings['hcbs_nodups.bed'] += loading
+	for filename in results:
+		began = time.time()
+		f = open(filename, 'w')
+		for line in results[filename]:
+			print >> f, line
 		f.close()
-		#have to unextend the RNAs on the human side
-		database = list()
-		with open('comhvp.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-		mchroms = database[0::8]
-		mstarts = database[1::8]
-		mends = database[2::8]
-		mnames = database[3::8]
-		hchroms = database[4::8]
-		hstarts = database[5::8]
-		hends = database[6::8]
-		hnames = database[7::8]
-		starts2 = list()
-		ends2 = list()
-		for x in hstarts:
-			one_start = x
-			if one_start !='chromStart':
-				one_start = int(x)
-				one_start = one_start + extend_circRNA
-			starts2.append(one_start)
-
-
-		for x in hends:
-			one_end = x
-			if one_end != 'chromEnd':
-				one_end = int(x)
-				one_end = one_end - extend_circRNA
-			ends2.append(one_end)
-
+		timings[filename] += time.time() - began
+
+
+def _incrementalEngine(parser, eiom, p, timings):
+	''' Runs incrementalParser() from a fresh state in the current directory, so its four files can be checked against a full mainParser run.  It saves the four together, so their seconds are all recorded against the last of them. '''
+	import time
+	began = time.time()
+	#a state left by an earlier check would make this an update instead of a fresh run
+	if os.path.exists('incremental_state.json'):
+		os.remove('incremental_state.json')
+	parser.incrementalParser(eiom)
+	timings[MAIN_PARSER_RESULTS[-1]] = time.time() - began
+
+
+#the engines DataParser.equivalenceCheck() knows by name
+EQUIVALENCE_ENGINES = {
+	'memory': _memoryEngine,
+	'incremental': _incrementalEngine,
+	'banded': lambda parser, eiom, p, timings: _legacyEngine(parser, eiom, p, timings, banded_join=True),
+	'parallel': lambda parser, eiom, p, timings: _legacyEngine(parser, eiom, p, timings, workers=4),
+}
+
+
+def _compareRows(legacy, other, rows):
+	''' Compares two files as multisets of their non blank lines, returning whether they are equal, their row counts, and the first rows (in sorted order) found more often in one than the other '''
+	counts = dict()
+	for line in _bedLines(legacy):
+		counts[line] = counts.get(line, 0) + 1
+	total = 0
+	for line in _bedLines(other):
+		counts[line] = counts.get(line, 0) - 1
+		total += 1
+	missing = sorted([line for line in counts if counts[line] > 0])
+	extra = sorted([line for line in counts if counts[line] < 0])
+	return {'equal': missing == [] and extra == [], 'legacy_rows': sum([c for c in counts.values()]) + total, 'rows': total, 'missing': missing[:rows], 'extra': extra[:rows]}
+
+
+def _speedups(order, legacy, engine):
+	''' Sets the seconds of each file an engine saved against the legacy seconds of the steps since the previous file it saved, in the order of order '''
+	speedups = dict()
+	spent = 0.0
+	for filename in order:
+		spent += legacy.get(filename, 0.0)
+		if filename in engine:
+			speedups[filename] = spent / engine[filename] if engine[filename] > 0 else null
+			spent = 0.0
+	return speedups
+
+
+#the columns of the files mainParser saves, the _PAIR_COLUMNS files hold the genome of interest on the left and the human circRNA on the right
+_BED12_COLUMNS = [('chrom', 'TEXT'), ('chromStart', 'INTEGER'), ('chromEnd', 'INTEGER'), ('name', 'TEXT'), ('score', 'TEXT'), ('strand', 'TEXT'), ('thickStart', 'INTEGER'), ('thickEnd', 'INTEGER'), ('itemRgb', 'TEXT'), ('blockCount', 'INTEGER'), ('blockSizes', 'TEXT'), ('blockStarts', 'TEXT')]
+_BED12_PAIR_COLUMNS = _BED12_COLUMNS + [('b_' + c, t) for c, t in _BED12_COLUMNS]
+_INTRON_COLUMNS = [('chrom', 'TEXT'), ('chromStart', 'INTEGER'), ('chromEnd', 'INTEGER'), ('name', 'TEXT')]
+_PAIR_COLUMNS = _INTRON_COLUMNS + [('human_chrom', 'TEXT'), ('human_chromStart', 'INTEGER'), ('human_chromEnd', 'INTEGER'), ('human_name', 'TEXT')]
+
+#every file mainParser saves, in the order it saves them
+MAIN_PARSER_OUTPUTS = [
+	('extended_lifted_mouse_circRNA_file.bed', _BED12_COLUMNS),
+	('hcf_elmcf.bed', _BED12_COLUMNS),
+	('hcf_elmcf_same_start.bed', _BED12_COLUMNS),
+	('hcf_elmcf_same_end.bed', _BED12_COLUMNS),
+	('hcf_elmcfss_sine.bed', _BED12_COLUMNS),
+	('hcf_elmcfse_sine.bed', _BED12_COLUMNS),
+	('hcf_elmcfsss_unextended.bed', _BED12_COLUMNS),
+	('hcf_elmcfses_unextended.bed', _BED12_COLUMNS),
+	('hesu_nodups.bed', _BED12_COLUMNS),
+	('heeu_nodups.bed', _BED12_COLUMNS),
+	('hcb_sine.bed', _BED12_COLUMNS),
+	('hcbs_nodups.bed', _BED12_COLUMNS),
+	('hcbs_reextended.bed', _BED12_COLUMNS),
+	('hc_extended.bed', _BED12_COLUMNS),
+	('mc_same.bed', _BED12_COLUMNS),
+	('mc_same_sine.bed', _BED12_COLUMNS),
+	('mcss_nodups.bed', _BED12_COLUMNS),
+	('forced_liftover_mcss.bed', _BED12_COLUMNS),
+	('flm_start_extended.bed', _BED12_COLUMNS),
+	('flm_end_extended.bed', _BED12_COLUMNS),
+	('fse_b1b2.bed', _BED12_COLUMNS),
+	('fee_b1b2.bed', _BED12_COLUMNS),
+	('fseb_unextended.bed', _BED12_COLUMNS),
+	('feeb_unextended.bed', _BED12_COLUMNS),
+	('mcb_both.bed', _BED12_COLUMNS),
+	('mcbb_nodups.bed', _BED12_COLUMNS),
+	('introns_mcbb.bed', _INTRON_COLUMNS),
+	('imcbb_unextended.bed', _INTRON_COLUMNS),
+	('forced_liftover_mcf_human.bed', _BED12_COLUMNS),
+	('humanCircRNAfinalextended.bed', _BED12_PAIR_COLUMNS),
+	('hcf_normal.bed', _BED12_COLUMNS),
+	('hcfn_nodups.bed', _BED12_COLUMNS),
+	('hcrpm.bed', _BED12_PAIR_COLUMNS),
+	('hcrpm_nodups.bed', _BED12_PAIR_COLUMNS),
+	('cofmv.bed', _PAIR_COLUMNS),
+	('comhvp.bed', _PAIR_COLUMNS),
+	('comparison_of_mouse_human_final.bed', _PAIR_COLUMNS),
+	('cofmvv_use.bed', _PAIR_COLUMNS),
+	('narrow_list_human_mouse.bed', _PAIR_COLUMNS),
+	('nlhm_final.bed', _PAIR_COLUMNS),
+]
+
+
+#the file extensions read and written as columnar tables instead of tab separated text
+_COLUMNAR_EXTENSIONS = {'parquet': ('.parquet', '.pq'), 'arrow': ('.arrow', '.ipc')}
+
+
+def _columnarFormat(filename):
+	''' Returns 'parquet' or 'arrow' if filename has a columnar extension, or None for a bed file '''
+	extension = os.path.splitext(filename)[1].lower()
+	for format in _COLUMNAR_EXTENSIONS:
+		if extension in _COLUMNAR_EXTENSIONS[format]:
+			return format
+	return null
+
+
+def _importArrow():
+	try:
+		import pyarrow
+	except ImportError:
+		raise ImportError('pyarrow must be installed to read or write parquet and arrow files')
+	return pyarrow
+
+
+def _readColumnar(filename):
+	''' Reads a Parquet file one row group at a time, or memory maps an Arrow IPC file and reads it one record batch at a time, and yields its rows as lists of strings in column order so they can stand in for bed rows.
+		This is not free: every value of a row group or batch is converted to a Python string before its rows are yielded, so a columnar input costs about as much to read as the same bed file, and only one row group or batch is held converted at a time.
+	'''
+	pa = _importArrow()
+	if _columnarFormat(filename) == 'parquet':
+		import pyarrow.parquet
+		parquet = pyarrow.parquet.ParquetFile(filename)
+		batches = (parquet.read_row_group(i) for i in range(parquet.num_row_groups))
+	else:
+		reader = pa.RecordBatchFileReader(pa.memory_map(filename, 'r'))
+		batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+	for batch in batches:
+		columns = [batch.column(i).to_pylist() for i in range(batch.num_columns)]
+		for i in range(batch.num_rows):
+			yield ['' if column[i] == null else str(column[i]) for column in columns]
+
+
+def _writeColumnar(filename, rows, columns, format):
+	''' Writes typed rows, as produced by _typedRows(), to a Parquet or Arrow IPC file '''
+	pa = _importArrow()
+	values = [list() for c in columns]
+	for row in rows:
+		for i in range(len(values)):
+			values[i].append(row[i])
+	types = {'INTEGER': pa.int64(), 'TEXT': pa.string()}
+	arrays = [pa.array(values[i], type=types[columns[i][1]]) for i in range(len(columns))]
+	table = pa.Table.from_arrays(arrays, names=[c for c, t in columns])
+	if format == 'parquet':
+		import pyarrow.parquet
+		pyarrow.parquet.write_table(table, filename)
+		return
+	sink = pa.OSFile(filename, 'wb')
+	try:
+		writer = pa.RecordBatchFileWriter(sink, table.schema)
+		writer.write_table(table)
+		writer.close()
+	finally:
+		sink.close()
+
+
+def _bedInput(filename, role):
+	''' Returns filename, or for a parquet or arrow file the name of a bed copy written to the current directory, for the steps that hand files to bedtools or read them as BedTables.
+		Writing the copy reads the whole input through _readColumnar() and writes it out again as text once per call, so it takes about the time and disk space of the bed file it stands for.
+		The copy is named after role and the md5 of the absolute name of filename, so inputs sharing a base name get copies of their own, and the same input gets the same name on every call for the journal of resume.
+	'''
+	if filename == null or _columnarFormat(filename) == null:
+		return filename
+	import hashlib
+	bed = 'input_' + role + '_' + hashlib.md5(os.path.abspath(filename)).hexdigest()[:12] + '.bed'
+	f = _openOutput(bed)
+	for row in _readColumnar(filename):
+		print >> f, "\t".join(row)
+	f.close()
+	return bed
+
+
+#the DataParser inputs in the order _bedInputs() takes them by default
+_INPUT_ROLES = ['hcf', 'mcf', 'mclf', 'hrsinef', 'mrb1b2f']
+
+
+def _bedInputs(sources, roles=_INPUT_ROLES):
+	''' Returns the _bedInput() of each of sources, removing the copies already written if one of them fails '''
+	copies = list()
+	try:
+		for source, role in zip(sources, roles):
+			copies.append(_bedInput(source, role))
+	except Exception:
+		_removeBedCopies(sources[:len(copies)], copies)
+		raise
+	return copies
+
+
+def _removeBedCopies(sources, copies):
+	''' Removes the bed copies _bedInputs() wrote for sources '''
+	for source, copy in zip(sources, copies):
+		if copy != source and os.path.exists(copy):
+			os.remove(copy)
+
+
+def _bedLines(filename):
+	''' Yields the non blank lines of a file without their line ends, waiting for the read started by _prefetch() if there is one and no memory budget is set, see _mappedLines() '''
+	pending = _prefetched(filename)
+	if pending != null and _MEMORY_LIMIT == null:
+		lines = pending.get()
+		_counted(len(lines), sum([len(line) + 1 for line in lines]))
+		for line in lines:
+			yield line
+		return
+	for line in _mappedLines(filename):
+		yield line
+
+
+def _readLines(filename):
+	''' Returns the lines of _mappedLines() as a list, for _prefetch() '''
+	return list(_mappedLines(filename))
+
+
+def _mappedLines(filename):
+	''' Yields the non blank lines of a file without their line ends.  The file is memory mapped and split at the newline bytes 16MB at a time, instead of line by line through the csv module.  A gzip or bgzip compressed file is inflated as it is read instead, see _inflatedBlocks(). '''
+	import mmap
+	with open(filename, 'rb') as f:
+		if os.fstat(f.fileno()).st_size == 0:
+			return
+		if f.read(2) == _GZIP_MAGIC:
+			f.seek(0)
+			for line in _blockLines(_inflatedBlocks(f)):
+				yield line
+			return
+		buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		try:
+			for line in _blockLines(buffer[i:i + (1 << 24)] for i in range(0, len(buffer), 1 << 24)):
+				yield line
+		finally:
+			buffer.close()
+
+
+def _blockLines(blocks):
+	''' Yields the non blank lines, without their line ends, of text given in blocks that may end part way through a line '''
+	rest = ''
+	for block in blocks:
+		lines = (rest + block).split("\n")
+		#the last piece runs on into the next block
+		rest = lines.pop()
+		_counted(len(lines), len(block))
+		for line in lines:
+			if line.endswith("\r"):
+				line = line[:-1]
+			if line:
+				yield line
+	if rest.endswith("\r"):
+		rest = rest[:-1]
+	if rest:
+		_counted(1, 0)
+		yield rest
+
+
+#the first two bytes of every gzip member, bgzip blocks included
+_GZIP_MAGIC = '\x1f\x8b'
+
+
+def _isCompressed(filename):
+	''' Returns True when filename starts with a gzip member '''
+	with open(filename, 'rb') as f:
+		return f.read(2) == _GZIP_MAGIC
+
+
+def _inflatedBlocks(f):
+	''' Yields the text of an open gzip file 1MB of compressed bytes at a time.  The file may hold any number of members one after another, as _openOutput() and bgzip write them. '''
+	import zlib
+	inflater = zlib.decompressobj(31)
+	for data in iter(lambda: f.read(1 << 20), ''):
+		while data:
+			yield inflater.decompress(data)
+			#whatever follows the end of a member starts the next one
+			data = inflater.unused_data
+			if data:
+				inflater = zlib.decompressobj(31)
+
+
+#the compression of the files written through _openOutput() for the length of a mainParser call, 'gzip' or 'bgzip'; None to write plain text
+_COMPRESSION = null
+#the threads compressing each file written through _openOutput()
+_COMPRESSION_THREADS = 4
+#the bytes of text compressed at a time by one thread
+_COMPRESSION_BLOCK = 1 << 20
+#the bytes of text in each BGZF block, as bgzip uses, so that a block never outgrows the 64KB its header can describe
+_BGZF_BLOCK = 0xff00
+#the empty block that ends every BGZF file
+_BGZF_EOF = '\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00\x42\x43\x02\x00\x1b\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+
+
+def _compression(compress):
+	''' Checks a compress argument, returning it '''
+	if compress not in (null, 'gzip', 'bgzip'):
+		raise ValueError("compress must be 'gzip', 'bgzip' or None, not " + repr(compress))
+	return compress
+
+
+def _openOutput(filename, compress=None):
+	''' Opens filename for writing a bed file in plain text, or compressed by compress or else by the compression of the current mainParser call, see _CompressedFile '''
+	kind = _compression(compress)
+	if kind == null:
+		kind = _COMPRESSION
+	if kind == null:
+		return open(filename, 'w')
+	return _CompressedFile(filename, kind, _COMPRESSION_THREADS)
+
+
+def _gzipMember(text):
+	''' Compresses text as one gzip member '''
+	import zlib
+	compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+	return compressor.compress(text) + compressor.flush()
+
+
+def _bgzfBlocks(text):
+	''' Compresses text as BGZF blocks: gzip members of _BGZF_BLOCK bytes of text each, with their compressed size in an extra header field '''
+	import struct
+	import zlib
+	blocks = list()
+	for i in range(0, len(text), _BGZF_BLOCK):
+		piece = text[i:i + _BGZF_BLOCK]
+		compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+		deflated = compressor.compress(piece) + compressor.flush()
+		blocks.append(struct.pack('<4BI2BH2BHH', 31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, len(deflated) + 25) + deflated + struct.pack('<II', zlib.crc32(piece) & 0xffffffff, len(piece)))
+	return ''.join(blocks)
+
+
+class _CompressedFile(object):
+	''' A file written through print >> or write() whose text is gathered into pieces of _COMPRESSION_BLOCK bytes, compressed by a pool of threads and written out in order.
+		zlib lets go of the interpreter lock while it compresses, so the pieces are compressed while the caller goes on producing rows, and at most two pieces per thread wait at a time.
+	
+	:param filename: the name of the file to write
+	:type filename: string
+	:param kind: 'gzip' to write each piece as a gzip member, or 'bgzip' to write BGZF blocks ending with the BGZF end of file block
+	:type kind: string
+	:param threads: the number of threads compressing
+	:type threads: int
+	'''
+	def __init__(self, filename, kind, threads):
+		from multiprocessing.pool import ThreadPool
+		self._file = open(filename, 'wb')
+		self._kind = kind
+		self._compress = _bgzfBlocks if kind == 'bgzip' else _gzipMember
+		self._pool = ThreadPool(max(threads, 1))
+		self._waiting = max(threads, 1) * 2
+		self._pending = list()
+		self._pieces = list()
+		self._size = 0
+		self._written = False
+	def write(self, text):
+		self._pieces.append(text)
+		self._size += len(text)
+		if self._size >= _COMPRESSION_BLOCK:
+			self._submit()
+	def _submit(self):
+		if self._pieces:
+			self._pending.append(self._pool.apply_async(self._compress, (''.join(self._pieces),)))
+			self._pieces = list()
+			self._size = 0
+			self._written = True
+		while len(self._pending) > self._waiting:
+			self._file.write(self._pending.pop(0).get())
+	def close(self):
+		try:
+			self._submit()
+			for pending in self._pending:
+				self._file.write(pending.get())
+			self._pending = list()
+			if self._kind == 'bgzip':
+				self._file.write(_BGZF_EOF)
+			elif not self._written:
+				#an empty gzip file still holds one member
+				self._file.write(_gzipMember(''))
+		finally:
+			self._pool.terminate()
+			self._file.close()
+
+
+def _splitLine(line):
+	''' Splits a line at its tabs; a line with double quotes goes through the csv module, which removes them as the readers of this module always have '''
+	if '"' in line:
+		return next(csv.reader([line], dialect="excel-tab"))
+	return line.split("\t")
+
+
+def _iterBed(filename):
+	''' Yields the rows of a tab separated bed file one at a time, skipping blank lines and the chromStart/chromEnd header rows.  Parquet and Arrow files are read through pyarrow instead.
+	
+	:param filename: the name of the bed file
+	:type filename: string
+	'''
+	if _columnarFormat(filename) != null:
+		for line in _readColumnar(filename):
+			yield line
+		return
+	for line in _bedLines(filename):
+		fields = _splitLine(line)
+		if fields[1:2] == ['chromStart'] or fields[1:2] == ["'chromStart'"]:
+			continue
+		yield fields
+
+
+def _readBed(filename):
+	''' Reads a tab separated bed file into a list of rows, see _iterBed()
+	
+	:param filename: the name of the bed file
+	:type filename: string
+	:returns: list of rows, each a list of strings
+	'''
+	return list(_iterBed(filename))
+
+
+class SymbolTable(object):
+	''' Gives every distinct string a dense integer code, in the order the strings are first seen, so that chromosomes and circRNA names are held and compared as ints and only turned back into strings for output '''
+	def __init__(self):
+		import threading
+		self.codes = dict()
+		self.strings = list()
+		self._lock = threading.Lock()
+	def __len__(self):
+		return len(self.strings)
+	def code(self, string):
+		''' Returns the code of string, giving it the next code if it has none yet '''
+		code = self.codes.get(string)
+		if code == null:
+			with self._lock:
+				code = self.codes.setdefault(string, len(self.strings))
+				if code == len(self.strings):
+					self.strings.append(string)
+		return code
+	def find(self, string):
+		''' Returns the code of string, or None if it has none '''
+		return self.codes.get(string)
+	def decode(self, code):
+		return self.strings[code]
+
+
+#the symbol tables shared by every BedTable loaded since the last _resetSymbols()
+CHROMOSOMES = SymbolTable()
+NAMES = SymbolTable()
+
+
+def _resetSymbols():
+	''' Starts new symbol tables for the BedTables loaded from now on, so the strings of a finished run are not held for the life of the process.  Every BedTable keeps the tables it was coded with. '''
+	global CHROMOSOMES, NAMES
+	CHROMOSOMES = SymbolTable()
+	NAMES = SymbolTable()
+
+
+class BedTable(object):
+	''' The rows of a tab separated bed file, tokenized by _bedLines().  The chromosomes, starts, ends and names are split out up front into four integer arrays, the chromosomes and names as their codes in the CHROMOSOMES and NAMES of the time it is loaded (kept as chrom_symbols and name_symbols), and the other columns of a row are only split out when the row is looked at, so the table holds one string per row instead of a list of twelve.
+		Blank lines and the chromStart/chromEnd header rows are left out.  Indexing gives the row as a list of strings like _readBed(), and IntervalIndex, _bandedJoin() and the name joins work from the row numbers, arrays and codes without splitting rows.
+	
+	:param filename: the name of the bed file
+	:type filename: string
+	'''
+	def __init__(self, filename):
+		import array
+		self.chrom_symbols = CHROMOSOMES
+		self.name_symbols = NAMES
+		self.lines = list()
+		chroms = list()
+		starts = list()
+		ends = list()
+		names = list()
+		for line in _bedLines(filename):
+			if '"' in line:
+				fields = _splitLine(line)
+			else:
+				fields = line.split("\t", 4)
+			if fields[1:2] == ['chromStart'] or fields[1:2] == ["'chromStart'"]:
+				continue
+			if len(fields) < 3:
+				raise ValueError(filename + ' has a row with fewer than 3 columns: ' + line)
+			self.lines.append(line)
+			chroms.append(self.chrom_symbols.code(fields[0]))
+			starts.append(int(fields[1]))
+			ends.append(int(fields[2]))
+			#rows of three columns have no name
+			names.append(self.name_symbols.code(fields[3]) if len(fields) > 3 else -1)
+		self.chrom_codes = array.array('i', chroms)
+		self.starts = array.array('l', starts)
+		self.ends = array.array('l', ends)
+		self.name_codes = array.array('i', names)
+	def __len__(self):
+		return len(self.lines)
+	def __getitem__(self, k):
+		return _splitLine(self.lines[k])
+	def chrom(self, k):
+		''' Returns the chromosome of row k '''
+		return self.chrom_symbols.strings[self.chrom_codes[k]]
+	def name(self, k):
+		''' Returns the name column of row k, or None for a row of three columns '''
+		if self.name_codes[k] < 0:
+			return null
+		return self.name_symbols.strings[self.name_codes[k]]
+	def byCode(self):
+		''' Returns a dictionary from each name code to the numbers of its rows '''
+		codes = dict()
+		for k in range(len(self.lines)):
+			codes.setdefault(self.name_codes[k], list()).append(k)
+		return codes
+	def byName(self):
+		''' Returns a dictionary from each name to the numbers of its rows, like _nameIndex() '''
+		return dict([(self.name_symbols.strings[code] if code >= 0 else null, rows) for code, rows in self.byCode().items()])
+
+
+#the BedTables kept between the jobs of main(), by absolute file name, modification time and size; None outside of main()
+_TABLE_CACHE = null
+
+
+def _bedTable(filename):
+	''' Returns the BedTable of an input file, loaded once per main() call for all of its jobs '''
+	if _TABLE_CACHE == null:
+		return BedTable(filename)
+	status = os.stat(filename)
+	key = (os.path.abspath(filename), status.st_mtime, status.st_size)
+	if key not in _TABLE_CACHE:
+		_TABLE_CACHE[key] = BedTable(filename)
+	return _TABLE_CACHE[key]
+
+
+def _coords(rows):
+	''' Returns the chromosome, start and end of every row, taken from the arrays of a BedTable without splitting its rows '''
+	if isinstance(rows, BedTable):
+		return zip([rows.chrom_symbols.strings[code] for code in rows.chrom_codes], rows.starts, rows.ends)
+	return [(row[0], int(row[1]), int(row[2])) for row in rows]
+
+
+def _typedRows(filename, columns):
+	''' Yields the rows of a bed file as tuples matching columns, with the INTEGER columns converted to int '''
+	integers = [t == 'INTEGER' for c, t in columns]
+	width = len(columns)
+	for row in _iterBed(filename):
+		if len(row) < width:
+			row = row + [null] * (width - len(row))
+		yield tuple([int(row[i]) if integers[i] and row[i] != null else row[i] for i in range(width)])
+
+
+class IntervalIndex(object):
+	''' Sorted per-chromosome index over bed rows.  Overlaps are found by binary search on the interval starts, bounded by the longest interval on the chromosome, and use the same half-open overlap rule as bedtools intersect.
+	
+	:param rows: list of rows with the chromosome, start and end in the first three columns, or a BedTable
+	:type rows: list
+	'''
+	def __init__(self, rows):
+		self.rows = rows
+		by_chrom = dict()
+		for i, (chrom, start, end) in enumerate(_coords(rows)):
+			by_chrom.setdefault(chrom, list()).append((start, end, i))
+		self.starts = dict()
+		self.ends = dict()
+		self.ids = dict()
+		self.span = dict()
+		for chrom in by_chrom:
+			entries = by_chrom[chrom]
+			entries.sort()
+			self.starts[chrom] = [x[0] for x in entries]
+			self.ends[chrom] = [x[1] for x in entries]
+			self.ids[chrom] = [x[2] for x in entries]
+			self.span[chrom] = max([x[1] - x[0] for x in entries])
+	def _window(self, chrom, start, end):
+		starts = self.starts.get(chrom)
+		if starts == null:
+			return 0, 0
+		#no interval starting at or before start - span can reach past start
+		lo = bisect.bisect_right(starts, start - self.span[chrom])
+		hi = bisect.bisect_left(starts, end)
+		return lo, hi
+	def overlapping(self, chrom, start, end):
+		''' Returns the row numbers of the intervals overlapping chrom:start-end
+		
+		:rtype: list
+		'''
+		lo, hi = self._window(chrom, start, end)
+		ends = self.ends.get(chrom)
+		ids = self.ids.get(chrom)
+		return [ids[k] for k in range(lo, hi) if ends[k] > start]
+	def anyOverlap(self, chrom, start, end):
+		''' Returns True if any interval overlaps chrom:start-end
+		
+		:rtype: bool
+		'''
+		lo, hi = self._window(chrom, start, end)
+		ends = self.ends.get(chrom)
+		for k in range(lo, hi):
+			if ends[k] > start:
+				return True
+		return False
+	def count(self, chrom, start, end):
+		''' Returns the number of intervals overlapping chrom:start-end
+		
+		:rtype: int
+		'''
+		return len(self.overlapping(chrom, start, end))
+
+
+def _iterRepeatMasker(filename):
+	''' Yields (chrom, start, end, class, family, subfamily) for every repeat of a RepeatMasker table, read as either the UCSC rmsk table (with or without its bin column), the RepeatMasker .out format (1-based, converted to bed coordinates), or a bed file whose name column is used as both family and subfamily.  A gzip compressed table, such as rmsk.txt.gz, is read as it is, see _bedLines(). '''
+	for line in _bedLines(filename):
+		fields = line.split('\t')
+		if len(fields) in (16, 17) and fields[-8] in ('+', '-'):
+			#UCSC rmsk: genoName, genoStart, genoEnd, ..., strand, repName, repClass, repFamily, ...
+			fields = fields[-16:]
+			yield fields[4], int(fields[5]), int(fields[6]), fields[10], fields[11], fields[9]
+			continue
+		words = line.split()
+		if len(words) >= 11 and words[8] in ('+', 'C') and words[5].isdigit():
+			#RepeatMasker .out: score, div, del, ins, sequence, begin, end, left, strand, repeat, class/family, ...
+			family = words[10].split('/')
+			yield words[4], int(words[5]) - 1, int(words[6]), family[0], family[-1], words[9]
+			continue
+		if len(fields) >= 4 and fields[1].isdigit():
+			yield fields[0], int(fields[1]), int(fields[2]), fields[3], fields[3], fields[3]
+
+
+class RepeatFamilyIndex(object):
+	''' Sorted per-chromosome index over every repeat of a RepeatMasker table, each labelled with an integer code for its family (repFamily, e.g. Alu, MIR, B2, ID) and for its subfamily (repName, e.g. AluY, B1_Mm).
+		One flank query finds the families with a repeat in the start window and in the end window of a circRNA, so every family is checked in a single pass over the circRNAs.
+	
+	:param filename: the name of the RepeatMasker table, see _iterRepeatMasker()
+	:type filename: string
+	:param classes: the repeat classes (repClass, e.g. 'SINE') to keep, or None to keep every class (default ('SINE',))
+	:type classes: tuple
+	'''
+	def __init__(self, filename, classes=('SINE',)):
+		import array
+		self.families = list()
+		self.subfamilies = list()
+		family_codes = dict()
+		subfamily_codes = dict()
+		by_chrom = dict()
+		for chrom, start, end, repeat_class, family, subfamily in _iterRepeatMasker(filename):
+			if classes != null and repeat_class not in classes:
+				continue
+			if family not in family_codes:
+				family_codes[family] = len(self.families)
+				self.families.append(family)
+			if subfamily not in subfamily_codes:
+				subfamily_codes[subfamily] = len(self.subfamilies)
+				self.subfamilies.append(subfamily)
+			by_chrom.setdefault(chrom, list()).append((start, end, family_codes[family], subfamily_codes[subfamily]))
+		self.starts = dict()
+		self.ends = dict()
+		self.family = dict()
+		self.subfamily = dict()
+		self.span = dict()
+		for chrom in by_chrom:
+			entries = by_chrom[chrom]
+			entries.sort()
+			self.starts[chrom] = array.array('l', [x[0] for x in entries])
+			self.ends[chrom] = array.array('l', [x[1] for x in entries])
+			self.family[chrom] = array.array('i', [x[2] for x in entries])
+			self.subfamily[chrom] = array.array('i', [x[3] for x in entries])
+			self.span[chrom] = max([x[1] - x[0] for x in entries])
+	def flanks(self, chrom, start, end, extend_sine, subfamilies=False):
+		''' Returns the sets of family codes (or subfamily codes) with a repeat overlapping the start window (start - extend_sine to end) and the end window (start to end + extend_sine), the windows of mainParser
+		
+		:rtype: tuple
+		'''
+		starts = self.starts.get(chrom)
+		if starts == null:
+			return set(), set()
+		labels = self.subfamily[chrom] if subfamilies else self.family[chrom]
+		ends = self.ends[chrom]
+		lo = bisect.bisect_right(starts, start - extend_sine - self.span[chrom])
+		hi = bisect.bisect_left(starts, end + extend_sine)
+		start_side = set()
+		end_side = set()
+		for k in range(lo, hi):
+			if starts[k] < end and ends[k] > start - extend_sine:
+				start_side.add(labels[k])
+			if ends[k] > start:
+				end_side.add(labels[k])
+		return start_side, end_side
+	def flankedBy(self, chrom, start, end, extend_sine, subfamilies=False):
+		''' Returns the names of the families (or subfamilies) with a repeat on both sides of chrom:start-end, sorted
+		
+		:rtype: list
+		'''
+		start_side, end_side = self.flanks(chrom, start, end, extend_sine, subfamilies)
+		names = self.subfamilies if subfamilies else self.families
+		return sorted([names[code] for code in start_side & end_side])
 
 
-		f = open('comparison_of_mouse_human_final.bed', 'w')
-		for i in range(len(mchroms)):
-			print >> f, mchroms[i] + "\t" + mstarts[i] + "\t" + mends[i] + "\t" + mnames[i] + "\t" + hchroms[i] + "\t" + repr(starts2[i]) + "\t" + repr(ends2[i]) + "\t" + hnames[i]
+def buildCoverageIndex(repeatfile, path, resolution=1):
+	''' Writes a CoverageIndex of a bed file of repeats to path.
+		For each chromosome it holds the starts and the ends of its repeats, each sorted on their own, in bins of resolution nt as little-endian uint32 after a json header.
+		The file takes 8 bytes per repeat whatever the resolution, so the default resolution 1 is exact; at a coarser resolution a window also counts repeats up to resolution nt outside of it.
+	
+	:param repeatfile: the name of the bed file of repeats
+	:type repeatfile: string
+	:param path: the name of the index file to write
+	:type path: string
+	:param resolution: the number of nt per bin (default 1)
+	:type resolution: int
+	'''
+	starts = dict()
+	ends = dict()
+	for row in _iterBed(repeatfile):
+		starts.setdefault(row[0], list()).append(int(row[1]) // resolution)
+		ends.setdefault(row[0], list()).append(-(-int(row[2]) // resolution))
+	header = {'resolution': resolution, 'layout': COVERAGE_LAYOUT, 'chroms': dict()}
+	offset = 0
+	for chrom in sorted(starts):
+		count = len(starts[chrom])
+		header['chroms'][chrom] = [offset, count]
+		offset = offset + 2 * (4 * count + (-4 * count % 8))
+	f = open(path + '.tmp', 'wb')
+	_writeHeader(f, header)
+	for chrom in sorted(starts):
+		_writeArray(f, 'I', sorted(starts[chrom]))
+		_writeArray(f, 'I', sorted(ends[chrom]))
+	f.close()
+	_replace(path + '.tmp', path)
+
+
+#the layout of the files of buildCoverageIndex, so older files are rebuilt
+COVERAGE_LAYOUT = 'sorted'
+
+
+class CoverageIndex(object):
+	''' Memory maps an index written by buildCoverageIndex(), so the number of repeats overlapping any window is found from two binary searches instead of an interval intersect, and several processes opening the same file share its pages.
+		A window overlaps every repeat starting before its end except the ones ending at or before its start, so the count is the difference of the two searches.
+	
+	:param path: the name of the index file
+	:type path: string
+	'''
+	def __init__(self, path):
+		import mmap
+		self._file = open(path, 'rb')
+		self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		header, base = _readHeader(self._map)
+		self.resolution = header['resolution']
+		self.layout = header.get('layout')
+		self.starts = dict()
+		self.ends = dict()
+		if self.layout != COVERAGE_LAYOUT:
+			return
+		for chrom in header['chroms']:
+			offset, count = header['chroms'][chrom]
+			size = 4 * count + (-4 * count % 8)
+			self.starts[str(chrom)] = _MappedArray(self._map, base + offset, 'I', count)
+			self.ends[str(chrom)] = _MappedArray(self._map, base + offset + size, 'I', count)
+	def count(self, chrom, start, end):
+		''' Returns the number of repeats overlapping chrom:start-end (at a resolution above 1, overlapping the bins the window touches) '''
+		starts = self.starts.get(chrom)
+		if starts == null:
+			return 0
+		started = bisect.bisect_left(starts, -(-end // self.resolution))
+		ended = bisect.bisect_right(self.ends[chrom], start // self.resolution)
+		return max(started - ended, 0)
+	def anyOverlap(self, chrom, start, end):
+		''' Returns True if any repeat overlaps chrom:start-end '''
+		return self.count(chrom, start, end) > 0
+	def flanked(self, chrom, start, end, extend_sine):
+		''' Returns True if a repeat lies within extend_sine of both sides of chrom:start-end, with the windows of mainParser '''
+		return self.count(chrom, start - extend_sine, end) > 0 and self.count(chrom, start, end + extend_sine) > 0
+	def close(self):
+		self._map.close()
+		self._file.close()
+
+
+def _writeHeader(f, header):
+	''' Writes the json header of a memory mapped index and its length, padded so the arrays after it start on an 8 byte boundary '''
+	import struct
+	text = json.dumps(header, sort_keys=True)
+	text = text + ' ' * (-(8 + len(text)) % 8)
+	f.write(struct.pack('<Q', len(text)))
+	f.write(text)
+
+
+def _readHeader(buffer):
+	''' Reads the header written by _writeHeader()
+	
+	:returns: (the header, the offset of the arrays after it)
+	'''
+	import struct
+	length = struct.unpack_from('<Q', buffer, 0)[0]
+	return json.loads(buffer[8:8 + length]), 8 + length
 
 
-		f.close()
-		#have to unextend human coords first
-		database = list()
-		with open('cofmv.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-		mchroms = database[0::8]
-		mstarts = database[1::8]
-		mends = database[2::8]
-		mnames = database[3::8]
-		hchroms = database[4::8]
-		hstarts = database[5::8]
-		hends = database[6::8]
-		hnames = database[7::8]
-		starts2 = list()
-		ends2 = list()
-		for x in hstarts:
-			one_start = x
-			if one_start !='chromStart':
-				one_start = int(x)
-				one_start = one_start + extend_circRNA
-			starts2.append(one_start)
+def _writeArray(f, code, values):
+	''' Writes values as little-endian numbers of the struct code, padded to a multiple of 8 bytes '''
+	import struct
+	for i in range(0, len(values), 65536):
+		chunk = values[i:i + 65536]
+		f.write(struct.pack('<' + repr(len(chunk)) + code, *chunk))
+	f.write('\0' * (-struct.calcsize(code) * len(values) % 8))
 
 
-		for x in hends:
-			one_end = x
-			if one_end != 'chromEnd':
-				one_end = int(x)
-				one_end = one_end - extend_circRNA
-			ends2.append(one_end)
+def buildSharedIndex(bedfile, path):
+	''' Writes the rows of a bed file and their interval index to path, to be memory mapped by SharedIntervalIndex.
+		After a json header come, for each chromosome, the starts, ends and row numbers of its intervals in start order as little-endian uint32, then the offset of every row in the text, the row numbers in name order, and the text of the rows.
+	
+	:param bedfile: the name of the bed file
+	:type bedfile: string
+	:param path: the name of the index file to write
+	:type path: string
+	'''
+	rows = _readBed(bedfile)
+	by_chrom = dict()
+	for i in range(len(rows)):
+		by_chrom.setdefault(rows[i][0], list()).append((int(rows[i][1]), int(rows[i][2]), i))
+	header = {'rows': len(rows), 'chroms': dict()}
+	offset = 0
+	for chrom in sorted(by_chrom):
+		entries = by_chrom[chrom]
+		entries.sort()
+		header['chroms'][chrom] = [offset, len(entries), max([x[1] - x[0] for x in entries])]
+		offset = offset + 3 * (4 * len(entries) + (-4 * len(entries) % 8))
+	lines = ["\t".join(row) for row in rows]
+	offsets = [0]
+	for line in lines:
+		offsets.append(offsets[-1] + len(line))
+	header['offsets'] = offset
+	header['names'] = offset + 8 * len(offsets)
+	header['text'] = header['names'] + 4 * len(rows) + (-4 * len(rows) % 8)
+	f = open(path + '.tmp', 'wb')
+	_writeHeader(f, header)
+	for chrom in sorted(by_chrom):
+		for column in (0, 1, 2):
+			_writeArray(f, 'I', [x[column] for x in by_chrom[chrom]])
+	_writeArray(f, 'Q', offsets)
+	_writeArray(f, 'I', sorted(range(len(rows)), key=lambda i: rows[i][3:4]))
+	for line in lines:
+		f.write(line)
+	f.close()
+	_replace(path + '.tmp', path)
+
+
+class _MappedArray(object):
+	''' Read only sequence over little-endian numbers in a memory map, so bisect can search them where they lie '''
+	def __init__(self, buffer, offset, code, length):
+		import struct
+		self._unpack = struct.unpack_from
+		self._buffer = buffer
+		self._offset = offset
+		self._format = '<' + code
+		self._size = struct.calcsize(code)
+		self._length = length
+	def __len__(self):
+		return self._length
+	def __getitem__(self, k):
+		if k < 0:
+			k = k + self._length
+		if k < 0 or k >= self._length:
+			raise IndexError('index out of range')
+		return self._unpack(self._format, self._buffer, self._offset + self._size * k)[0]
+
+
+class _MappedRows(object):
+	''' Read only sequence over the rows of a SharedIntervalIndex, splitting a row into its columns only when it is looked at '''
+	def __init__(self, buffer, offsets, text):
+		self._buffer = buffer
+		self._offsets = offsets
+		self._text = text
+	def __len__(self):
+		return len(self._offsets) - 1
+	def __getitem__(self, k):
+		if k < 0:
+			k = k + len(self)
+		if k < 0 or k >= len(self):
+			raise IndexError('index out of range')
+		return self._buffer[self._text + self._offsets[k]:self._text + self._offsets[k + 1]].split("\t")
+
+
+class _MappedNames(object):
+	''' The name lookup of a SharedIntervalIndex, answering get() like the dictionaries of _nameIndex() by binary search over the row numbers in name order '''
+	def __init__(self, rows, order):
+		self._rows = rows
+		self._order = order
+	def __len__(self):
+		return len(self._order)
+	def __getitem__(self, k):
+		return self._rows[self._order[k]][3:4]
+	def get(self, name, default=None):
+		found = list()
+		k = bisect.bisect_left(self, [name])
+		while k < len(self) and self[k] == [name]:
+			found.append(self._order[k])
+			k = k + 1
+		found.sort()
+		return found or default
+
+
+class SharedIntervalIndex(IntervalIndex):
+	''' Memory maps an index written by buildSharedIndex().  It answers overlapping() and anyOverlap() like an IntervalIndex of the same bed file, and its rows and names are read from the map as they are needed.
+		Nothing is parsed when it is opened, and every process opening the same file shares its pages, so N worker processes hold about one copy of the table.
+	
+	:param path: the name of the index file
+	:type path: string
+	'''
+	def __init__(self, path):
+		import mmap
+		self._file = open(path, 'rb')
+		self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		header, base = _readHeader(self._map)
+		self.starts = dict()
+		self.ends = dict()
+		self.ids = dict()
+		self.span = dict()
+		for chrom in header['chroms']:
+			offset, count, span = header['chroms'][chrom]
+			size = 4 * count + (-4 * count % 8)
+			self.starts[str(chrom)] = _MappedArray(self._map, base + offset, 'I', count)
+			self.ends[str(chrom)] = _MappedArray(self._map, base + offset + size, 'I', count)
+			self.ids[str(chrom)] = _MappedArray(self._map, base + offset + 2 * size, 'I', count)
+			self.span[str(chrom)] = span
+		offsets = _MappedArray(self._map, base + header['offsets'], 'Q', header['rows'] + 1)
+		self.rows = _MappedRows(self._map, offsets, base + header['text'])
+		self.names = _MappedNames(self.rows, _MappedArray(self._map, base + header['names'], 'I', header['rows']))
+	def close(self):
+		self._map.close()
+		self._file.close()
+
+
+#the four files of interest of mainParser
+MAIN_PARSER_RESULTS = ['mcbb_nodups.bed', 'imcbb_unextended.bed', 'hcfn_nodups.bed', 'nlhm_final.bed']
+
+
+def _circGroups(human, lifted, mouse, extend_circRNA):
+	''' Splits the circRNAs into groups whose rows in the results of _engineResults() cannot depend on each other: rows of hcf and mclf within extend_circRNA of each other in human coords, rows of mcf overlapping each other, and rows of mclf and mcf sharing a name end up in the same group
+	
+	:returns: the group number of each row of human, then lifted, then mouse
+	:rtype: list
+	'''
+	parent = range(len(human) + len(lifted) + len(mouse))
+	def find(i):
+		while parent[i] != i:
+			parent[i] = parent[parent[i]]
+			i = parent[i]
+		return i
+	def sweep(intervals):
+		#chained overlaps in start order
+		intervals.sort()
+		chrom = null
+		for interval in intervals:
+			if interval[0] == chrom and interval[1] < reach:
+				parent[find(interval[3])] = find(first)
+				reach = max(reach, interval[2])
+			else:
+				chrom, reach, first = interval[0], interval[2], interval[3]
+	#chromosomes and names are swept and joined as their codes, in tables of this call
+	chrom_code = SymbolTable().code
+	symbols = SymbolTable()
+	sweep([(chrom_code(human[i][0]), int(human[i][1]) - extend_circRNA, int(human[i][2]) + extend_circRNA, i) for i in range(len(human))] + [(chrom_code(lifted[i][0]), int(lifted[i][1]), int(lifted[i][2]), len(human) + i) for i in range(len(lifted))])
+	sweep([(chrom_code(mouse[i][0]), int(mouse[i][1]), int(mouse[i][2]), len(human) + len(lifted) + i) for i in range(len(mouse))])
+	#every row of mclf joins the first row of its name, and the rows of mcf join that row
+	names = dict()
+	for i in range(len(lifted)):
+		first = names.setdefault(symbols.code(lifted[i][3]), len(human) + i)
+		parent[find(len(human) + i)] = find(first)
+	for i in range(len(mouse)):
+		code = symbols.find(mouse[i][3])
+		if code in names:
+			parent[find(len(human) + len(lifted) + i)] = find(names[code])
+	return [find(i) for i in range(len(parent))]
+
+
+def _uniqueRows(rows):
+	''' Returns rows without repeated lines, keeping the first of each '''
+	seen = set()
+	unique = list()
+	for row in rows:
+		line = "\t".join(row)
+		if line not in seen:
+			seen.add(line)
+			unique.append(row)
+	return unique
+
+
+def _shifted(row, start_shift, end_shift):
+	return [row[0], repr(int(row[1]) + start_shift), repr(int(row[2]) + end_shift)] + row[3:]
+
+
+def _engineResults(human, lifted, mouse, sines, b1b2, introns, p, timings=None):
+	''' Computes the four files of interest of mainParser in memory, as the same rows as mainParser writes, blank lines and row order aside.
+		Every bedtools intersect becomes an IntervalIndex lookup and every sort | uniq a set, following the steps of DataParser._mainParserStages() including their cross-row intersects.
+	
+	:param human: the rows of hcf
+	:type human: list
+	:param lifted: the rows of mclf
+	:type lifted: list
+	:param mouse: the rows of mcf
+	:type mouse: list
+	:param sines: IntervalIndex of hrsinef
+	:param b1b2: IntervalIndex of mrb1b2f
+	:param introns: IntervalIndex of the extended intron file
+	:param p: the parameters, as in mainParser
+	:type p: dict
+	:param timings: if a dictionary, the seconds spent up to each of hcbs_nodups.bed, mcss_nodups.bed and the four files are recorded in it, and the lines of hcbs_nodups.bed and mcss_nodups.bed are returned as well (default None)
+	:type timings: dict
+	:returns: dictionary from each name in MAIN_PARSER_RESULTS to its list of lines
+	'''
+	import time
+	results = dict()
+	clock = [time.time()]
+	def checkpoint(name, lines):
+		if timings != null:
+			now = time.time()
+			timings[name] = now - clock[0]
+			clock[0] = now
+			results[name] = lines
+	es = p['extend_sine']
+	ec = p['extend_circRNA']
+	ei = p['extend_intron']
+	low = p['comp_distance_buffer_low']
+	high = p['comp_distance_buffer_high']
+	lifted_index = IntervalIndex(lifted)
+	#human circRNAs in the same place as a lifted circRNA, with sines on the start side and, through the overlap of hcb_sine.bed, the end side
+	candidates = [h for h in human if lifted_index.anyOverlap(h[0], int(h[1]) - ec, int(h[2]) + ec)]
+	start_side = _uniqueRows([h for h in candidates if sines.anyOverlap(h[0], int(h[1]) - es, int(h[2]))])
+	end_side = IntervalIndex(_uniqueRows([h for h in candidates if sines.anyOverlap(h[0], int(h[1]), int(h[2]) + es)]))
+	flanked = [h for h in start_side if end_side.anyOverlap(h[0], int(h[1]), int(h[2]))]
+	checkpoint('hcbs_nodups.bed', ["\t".join(h) for h in flanked])
+	flanked = IntervalIndex([_shifted(h, -ec, ec) for h in flanked])
+	#lifted circRNAs in the same place as one of those, forced back to the coords of the genome of interest
+	same = _uniqueRows([l for l in lifted if flanked.anyOverlap(l[0], int(l[1]), int(l[2]))])
+	checkpoint('mcss_nodups.bed', ["\t".join(l) for l in same])
+	mouse_names = _nameIndex(mouse)
+	forced = [mouse[j] for l in same for j in mouse_names.get(l[3], [])]
+	start_side = _uniqueRows([m for m in forced if b1b2.anyOverlap(m[0], int(m[1]) - es, int(m[2]))])
+	end_side = IntervalIndex(_uniqueRows([m for m in forced if b1b2.anyOverlap(m[0], int(m[1]), int(m[2]) + es)]))
+	both = [m for m in start_side if end_side.anyOverlap(m[0], int(m[1]), int(m[2]))]
+	checkpoint('mcbb_nodups.bed', ["\t".join(m) for m in both])
+	flanking_introns = list()
+	for m in both:
+		for k in introns.overlapping(m[0], int(m[1]), int(m[2])):
+			flanking_introns.append("\t".join(_shifted(introns.rows[k][:4], ei, -ei)))
+	checkpoint('imcbb_unextended.bed', flanking_introns)
+	#the lifted circRNAs of those, side by side with the human circRNAs they overlap once extended
+	lifted_names = _nameIndex(lifted)
+	extended = IntervalIndex([_shifted(h, -ec, ec) for h in human])
+	normal = set()
+	pairs = set()
+	for l in [lifted[j] for m in both for j in lifted_names.get(m[3], [])]:
+		for k in extended.overlapping(l[0], int(l[1]), int(l[2])):
+			normal.add("\t".join(human[k]))
+			normal.add("\t".join(_shifted(l, ec, -ec)))
+			pairs.add(("\t".join(l), "\t".join(human[k])))
+	checkpoint('hcfn_nodups.bed', list(normal))
+	final = list()
+	for pair in pairs:
+		l = pair[0].split("\t")
+		h = pair[1].split("\t")
+		x = int(l[1]) - int(h[1])
+		y = int(l[2]) - int(h[2])
+		if low <= x <= high and low <= y <= high:
+			for j in mouse_names.get(l[3], []):
+				final.append("\t".join(mouse[j][:4] + h[:4]))
+	checkpoint('nlhm_final.bed', final)
+	results.update({'mcbb_nodups.bed': ["\t".join(m) for m in both], 'imcbb_unextended.bed': flanking_introns, 'hcfn_nodups.bed': list(normal), 'nlhm_final.bed': final})
+	return results
+
+
+class ConservationIndex(object):
+	''' Holds the human circRNAs, the circRNAs of the genome of interest (native and lifted over) and both repeat files indexed in memory, so single circRNAs can be checked for conservation and flanking repeats without a mainParser run.
+	The windows are the ones mainParser uses: a circRNA is flanked when a repeat falls within extend_sine of its start and within extend_sine of its end, a lifted circRNA corresponds to a human circRNA when it overlaps the human circRNA extended by extend_circRNA, and a pair is conserved when mainParser writes it to nlhm_final.bed, see conserved().
+	Every query method takes the parameters as keyword arguments to override the defaults given here.
+	Any of the files may also be given as an IntervalIndex already built over it, such as a SharedIntervalIndex, and either repeat file as a CoverageIndex.
+	
+	:param hcf: the name of the file containing human circular RNA data in bed format
+	:type hcf: string
+	:param mcf: the name of the file containing the circular RNA data for the genome of interest in bed format
+	:type mcf: string
+	:param mclf: the name of the file containing the circular RNA data for the genome of interest lifted over to human coordinates
+	:type mclf: string
+	:param hrsinef: the name of the file containing the human SINEs in bed format
+	:type hrsinef: string
+	:param mrb1b2f: the name of the file containing the SINE equivalents of the genome of interest in bed format
+	:type mrb1b2f: string
+	:param inf: the name of an unextended intron file as produced by exonToIntron(), or None to skip intron lookups
+	:type inf: string
+	'''
+	def __init__(self, hcf, mcf, mclf, hrsinef, mrb1b2f, inf=None, extend_sine=2000, extend_circRNA=50, extend_intron=10, comp_distance_buffer_high=50, comp_distance_buffer_low=-50):
+		self.human = _intervalIndex(hcf)
+		mouse = _intervalIndex(mcf)
+		self.mouse = mouse.rows
+		self.lifted = _intervalIndex(mclf)
+		self.sines = _repeatIndex(hrsinef)
+		self.b1b2 = _repeatIndex(mrb1b2f)
+		self.introns = null
+		if inf != null:
+			self.introns = _intervalIndex(inf)
+		self.human_names = getattr(self.human, 'names', null) or _nameIndex(self.human.rows)
+		self.mouse_names = getattr(mouse, 'names', null) or _nameIndex(self.mouse)
+		self.defaults = _parameterDict(extend_sine, extend_circRNA, extend_intron, comp_distance_buffer_high, comp_distance_buffer_low)
+		self._final = dict()
+		self._lock = threading.Lock()
+	def _params(self, overrides):
+		params = dict(self.defaults)
+		for key in overrides:
+			if key not in params:
+				raise ValueError('unknown parameter ' + key)
+			if overrides[key] != null:
+				params[key] = int(overrides[key])
+		return params
+	def _flanked(self, repeats, row, extend_sine):
+		chrom = row[0]
+		start = int(row[1])
+		end = int(row[2])
+		if isinstance(repeats, CoverageIndex):
+			return repeats.flanked(chrom, start, end, extend_sine)
+		return repeats.anyOverlap(chrom, start - extend_sine, end) and repeats.anyOverlap(chrom, start, end + extend_sine)
+	def _finalLines(self, p):
+		''' Returns the set of the lines of nlhm_final.bed for the parameters p, computed by _engineResults() on the first call for them '''
+		key = tuple(sorted(p.items()))
+		with self._lock:
+			if key not in self._final:
+				human = [self.human.rows[i] for i in range(len(self.human.rows))]
+				lifted = [self.lifted.rows[i] for i in range(len(self.lifted.rows))]
+				mouse = [self.mouse[i] for i in range(len(self.mouse))]
+				#the introns only change imcbb_unextended.bed
+				self._final[key] = set(_engineResults(human, lifted, mouse, self.sines, self.b1b2, IntervalIndex([]), p)['nlhm_final.bed'])
+			return self._final[key]
+	def conserved(self, **params):
+		''' Returns the conserved pairs, as the lines mainParser writes to nlhm_final.bed: the first four columns of the circRNA of the genome of interest, then of the human circRNA.
+			They are found with the pairing and the flank checks of mainParser, including the ones between rows, once per set of parameters.
+		
+		:rtype: list
+		'''
+		return sorted(self._finalLines(self._params(params)))
+	def _record(self, row, p):
+		chrom = row[0]
+		start = int(row[1])
+		end = int(row[2])
+		flanked = self._flanked(self.sines, row, p['extend_sine'])
+		final = self._finalLines(p)
+		partners = list()
+		for i in self.lifted.overlapping(chrom, start - p['extend_circRNA'], end + p['extend_circRNA']):
+			lifted = self.lifted.rows[i]
+			start_delta = int(lifted[1]) - start
+			end_delta = int(lifted[2]) - end
+			within = p['comp_distance_buffer_low'] <= start_delta <= p['comp_distance_buffer_high'] and p['comp_distance_buffer_low'] <= end_delta <= p['comp_distance_buffer_high']
+			for j in self.mouse_names.get(lifted[3], []):
+				mouse = self.mouse[j]
+				mouse_flanked = self._flanked(self.b1b2, mouse, p['extend_sine'])
+				partner = {'name': mouse[3], 'chrom': mouse[0], 'start': int(mouse[1]), 'end': int(mouse[2]), 'lifted_chrom': lifted[0], 'lifted_start': int(lifted[1]), 'lifted_end': int(lifted[2]), 'start_delta': start_delta, 'end_delta': end_delta, 'flanked': mouse_flanked, 'conserved': within and "\t".join(list(mouse[:4]) + list(row[:4])) in final}
+				if self.introns != null and mouse_flanked:
+					partner['introns'] = self._introns(mouse, p['extend_intron'])
+				partners.append(partner)
+		return {'name': row[3], 'chrom': chrom, 'start': start, 'end': end, 'flanked': flanked, 'partners': partners}
+	def _introns(self, row, extend_intron):
+		found = list()
+		for i in self.introns.overlapping(row[0], int(row[1]) - extend_intron, int(row[2]) + extend_intron):
+			intron = self.introns.rows[i]
+			found.append({'chrom': intron[0], 'start': int(intron[1]), 'end': int(intron[2]), 'name': intron[3]})
+		return found
+	def query(self, name, **params):
+		''' Checks one human circRNA for flanking SINEs, its lifted partners in the genome of interest, their flanking repeats and whether the pair is conserved
+		
+		:param name: the name of the human circRNA
+		:type name: string
+		:returns: a dictionary with one entry in 'records' for every row of hcf with that name
+		'''
+		p = self._params(params)
+		records = [self._record(self.human.rows[i], p) for i in self.human_names.get(name, [])]
+		return {'name': name, 'found': records != [], 'records': records}
+	def region(self, chrom, start, end, **params):
+		''' Checks every human circRNA overlapping chrom:start-end, and reports the repeats of both files that fall in the region
+		
+		:returns: a dictionary with the human circRNA records and the repeat counts of the region
+		'''
+		p = self._params(params)
+		start = int(start)
+		end = int(end)
+		records = [self._record(self.human.rows[i], p) for i in self.human.overlapping(chrom, start, end)]
+		return {'chrom': chrom, 'start': start, 'end': end, 'records': records, 'human_repeats': self.sines.count(chrom, start, end), 'genome_repeats': self.b1b2.count(chrom, start, end)}
+	def batch(self, names, **params):
+		''' Runs query() for every name in names with one set of parameters
+		
+		:param names: the names of the human circRNAs
+		:type names: list
+		:returns: a dictionary from name to the query() result
+		'''
+		p = self._params(params)
+		results = dict()
+		for name in names:
+			records = [self._record(self.human.rows[i], p) for i in self.human_names.get(name, [])]
+			results[name] = {'name': name, 'found': records != [], 'records': records}
+		return results
+	def serve(self, host='127.0.0.1', port=8377, socket_path=None):
+		''' Answers queries as JSON until interrupted.  The routes are:
+			GET /circRNA?name=<name> for query(), GET /region?chrom=<chrom>&start=<start>&end=<end> for region(), and POST /batch with a JSON object {"names": [...]} for batch().
+			Any of the five parameters can be added to the query string (or the JSON object for /batch) to override the defaults.
+		
+		:param host: the address to listen on (default '127.0.0.1')
+		:type host: string
+		:param port: the port to listen on (default 8377)
+		:type port: int
+		:param socket_path: if given, listen on this Unix socket instead of host and port (default None)
+		:type socket_path: string
+		'''
+		if socket_path != null and os.path.exists(socket_path):
+			os.remove(socket_path)
+		server = _queryServer(self, host, port, socket_path)
+		print "Serving circRNA queries on " + (socket_path or host + ":" + repr(port))
+		try:
+			server.serve_forever()
+		except KeyboardInterrupt:
+			pass
+		server.server_close()
+		if socket_path != null and os.path.exists(socket_path):
+			os.remove(socket_path)
 
 
+def _intervalIndex(source):
+	''' Returns source if it is already an IntervalIndex, else an IntervalIndex of the bed file it names '''
+	if isinstance(source, IntervalIndex):
+		return source
+	if _columnarFormat(source) != null:
+		return IntervalIndex(_readBed(source))
+	return IntervalIndex(_bedTable(source))
 
-		f = open('cofmvv_use.bed', 'w')
-		for i in range(len(mchroms)):
-			print >> f, mchroms[i] + "\t" + mstarts[i] + "\t" + mends[i] + "\t" + mnames[i] + "\t" + hchroms[i] + "\t" + repr(starts2[i]) + "\t" + repr(ends2[i]) + "\t" + hnames[i]
 
+def _repeatIndex(source):
+	''' Returns source if it is a CoverageIndex, else _intervalIndex() of it '''
+	if isinstance(source, CoverageIndex):
+		return source
+	return _intervalIndex(source)
 
-		f.close()
-		#have to make sure human coords in comparison file are within 50 on both start and end of mouse
-		database = list()
-		with open('cofmvv_use.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-		mchroms = database[0::8]
-		mstarts = database[1::8]
-		mends = database[2::8]
-		mnames = database[3::8]
-		hchroms = database[4::8]
-		hstarts = database[5::8]
-		hends = database[6::8]
-		hnames = database[7::8]
-		f = open('narrow_list_human_mouse.bed', 'w')
-		for i in range(len(mchroms)):
-			ms = int(mstarts[i])
-			me = int(mends[i])
-			hs = int(hstarts[i])
-			he = int(hends[i])
-			x = ms - hs
-			y = me - he
-			if x >= distance_buffer_low:
-				if x <= distance_buffer_high:
-					if y >= distance_buffer_low:
-						if y <= distance_buffer_high:
-							print >> f, mchroms[i] + "\t" + mstarts[i] + "\t" + mends[i] + "\t" + mnames[i] + "\t" + hchroms[i] + "\t" + hstarts[i] + "\t" + hends[i] + "\t" + hnames[i]
 
+def _nameIndex(rows):
+	if isinstance(rows, BedTable):
+		return rows.byName()
+	names = dict()
+	for i in range(len(rows)):
+		names.setdefault(rows[i][3], list()).append(i)
+	return names
 
-		f.close()
-		#force liftover mouse
-		database = list()
-		with open('narrow_list_human_mouse.bed') as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					database.append(word)
-
-
-		mchroms = database[0::8]
-		mstarts = database[1::8]
-		mends = database[2::8]
-		mnames = database[3::8]
-		hchroms = database[4::8]
-		hstarts = database[5::8]
-		hends = database[6::8]
-		hnames = database[7::8]
-		data = list()
-		with open(mcf) as tsv:
-			for line in csv.reader(tsv, dialect="excel-tab"):
-				for word in line:
-					data.append(word)
-
-
-		chroms2 = data[0::12]
-		starts2 = data[1::12]
-		ends2 = data[2::12]
-		names2 = data[3::12]
-		f = open('nlhm_final.bed', 'w')
-		for i in range(len(mchroms)):
-			for j in range(len(chroms2)):
-				if names2[j] == mnames[i]:
-					print >> f, chroms2[j] + "\t" + starts2[j] + "\t" + ends2[j] + "\t" + names2[j] + "\t" + hchroms[i] + "\t" + hstarts[i] + "\t" + hends[i] + "\t" +  hnames[i]
 
 
-		f.close()
-		print "This function has saved 39 files to your computer, but four of them are of interest:"
-		print "mcbb_nodups.bed contains the circRNA from the genome of interest that correspond to circRNAs in human and contain sine equivalents on both sides within the specified sine buffer while also containing sines on both sides within the sine buffer on its human equivalent"
-		print "imcbb_unextended.bed contains the flanking introns of the circRNA contained in the mcbb_nodups.bed file"
-		print "hcfn_nodups.bed is the human circRNA that corresponds to the mcbb_nodups.bed circRNA"
-		print "nlhm_final.bed is the bed file containing both the human circRNA and the circRNA in mcbb_nodups.bed that corresponds side by side in a bed formatted list"
\ No newline at end of file
+class ConservationResults(object):
+	''' The side by side pairs of nlhm_final.bed held in memory and indexed by human name, by name in the genome of interest and by region in either genome, so pipelines and notebooks can look pairs up without reading the files again.  mainParser() returns one over the files it saved.
+		Every pair is a dictionary with 'human' and 'mouse' (each with the name, chrom, start and end of the circRNA), 'lifted' (the chrom, start and end of the circRNA of the genome of interest lifted over to human coords) and 'start_delta' and 'end_delta' (lifted minus human, as compared against the buffers).  'lifted' and the deltas come from narrow_list_human_mouse.bed and are None when it is missing.
+		The pairs are built once and shared between the answers, so they should not be changed.  Once loaded the object is only read, so any number of threads may look up pairs at the same time.
+	
+	:param directory: the directory holding the files saved by mainParser() (default the current directory)
+	:type directory: string
+	'''
+	def __init__(self, directory='.'):
+		lifted = dict()
+		narrow = os.path.join(directory, 'narrow_list_human_mouse.bed')
+		if os.path.exists(narrow):
+			for row in _rows(narrow, 8):
+				lifted.setdefault(tuple(row[3:8]), list()).append(row[:3])
+		rows = list(_rows(os.path.join(directory, 'nlhm_final.bed'), 8))
+		#nlhm_final.bed holds the rows of each row of narrow_list_human_mouse.bed in turn, as many for each as there are rows of mcf with its name
+		counts = dict()
+		for row in rows:
+			key = (row[3],) + tuple(row[4:8])
+			counts[key] = counts.get(key, 0) + 1
+		seen = dict()
+		self.pairs = list()
+		for row in rows:
+			key = (row[3],) + tuple(row[4:8])
+			pair = {'human': {'name': row[7], 'chrom': row[4], 'start': int(row[5]), 'end': int(row[6])}, 'mouse': {'name': row[3], 'chrom': row[0], 'start': int(row[1]), 'end': int(row[2])}, 'lifted': null, 'start_delta': null, 'end_delta': null}
+			if key in lifted:
+				k = seen.get(key, 0)
+				seen[key] = k + 1
+				chrom, start, end = lifted[key][k * len(lifted[key]) // counts[key]]
+				pair['lifted'] = {'chrom': chrom, 'start': int(start), 'end': int(end)}
+				pair['start_delta'] = int(start) - pair['human']['start']
+				pair['end_delta'] = int(end) - pair['human']['end']
+			self.pairs.append(pair)
+		self.human_names = dict()
+		self.mouse_names = dict()
+		for i in range(len(self.pairs)):
+			self.human_names.setdefault(self.pairs[i]['human']['name'], list()).append(i)
+			self.mouse_names.setdefault(self.pairs[i]['mouse']['name'], list()).append(i)
+		self.regions = dict([(genome, IntervalIndex([[pair[genome]['chrom'], pair[genome]['start'], pair[genome]['end']] for pair in self.pairs])) for genome in ('human', 'mouse')])
+		self._pool = null
+	def __len__(self):
+		return len(self.pairs)
+	def human(self, name):
+		''' Returns the pairs of the human circRNA name
+		
+		:rtype: list
+		'''
+		return [self.pairs[i] for i in self.human_names.get(name, [])]
+	def mouse(self, name):
+		''' Returns the pairs of the circRNA name of the genome of interest
+		
+		:rtype: list
+		'''
+		return [self.pairs[i] for i in self.mouse_names.get(name, [])]
+	def region(self, chrom, start, end, genome='human'):
+		''' Returns the pairs whose circRNA in genome, 'human' or 'mouse' (the genome of interest), overlaps chrom:start-end, in order of start
+		
+		:rtype: list
+		'''
+		if genome not in self.regions:
+			raise ValueError("genome must be 'human' or 'mouse', not " + repr(genome))
+		return [self.pairs[i] for i in sorted(self.regions[genome].overlapping(chrom, int(start), int(end)))]
+	def lookup(self, queries):
+		''' Answers a batch of queries in one call.  A query is a human circRNA name, or a dictionary: {'human': name}, {'mouse': name}, or {'chrom': chrom, 'start': start, 'end': end} with an optional 'genome' for region().
+		
+		:param queries: the queries
+		:type queries: list
+		:returns: the list of pairs of each query, in the order of queries
+		'''
+		answers = list()
+		for query in queries:
+			if isinstance(query, basestring):
+				answers.append(self.human(query))
+			elif 'human' in query:
+				answers.append(self.human(query['human']))
+			elif 'mouse' in query:
+				answers.append(self.mouse(query['mouse']))
+			elif 'chrom' in query:
+				answers.append(self.region(query['chrom'], query['start'], query['end'], query.get('genome', 'human')))
+			else:
+				raise ValueError('unknown query ' + repr(query))
+		return answers
+	def lookupAsync(self, queries, callback=None):
+		''' Starts lookup() of a batch of queries on a thread of this object and returns at once, so a web handler or an event loop is not held up while it runs.
+			The result has get(timeout), wait(timeout) and ready() like any multiprocessing AsyncResult; callback, if given, is called with the answers from that thread once they are ready.
+		
+		:returns: multiprocessing.pool.AsyncResult
+		'''
+		if self._pool == null:
+			from multiprocessing.pool import ThreadPool
+			self._pool = ThreadPool(2)
+		return self._pool.apply_async(self.lookup, (queries,), callback=callback)
+	def close(self):
+		''' Stops the threads of lookupAsync(), if any were started '''
+		if self._pool != null:
+			self._pool.close()
+			self._pool.join()
+			self._pool = null
+
+
+def _queryServer(index, host, port, socket_path):
+	''' Builds the threaded JSON server behind ConservationIndex.serve(), the http modules are only imported when a server is started '''
+	import BaseHTTPServer
+	import SocketServer
+	import urlparse
+	import json
+
+	class QueryHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+		def _reply(self, code, result):
+			body = json.dumps(result)
+			self.send_response(code)
+			self.send_header('Content-Type', 'application/json')
+			self.send_header('Content-Length', str(len(body)))
+			self.end_headers()
+			self.wfile.write(body)
+		def _answer(self, route, args):
+			params = dict()
+			for key in index.defaults:
+				if key in args:
+					params[key] = args.pop(key)
+			if route == '/circRNA':
+				return index.query(args['name'], **params)
+			if route == '/region':
+				return index.region(args['chrom'], args['start'], args['end'], **params)
+			if route == '/batch':
+				return index.batch(args['names'], **params)
+			return null
+		def _handle(self, route, args):
+			try:
+				result = self._answer(route, args)
+			except (KeyError, ValueError, TypeError), e:
+				self._reply(400, {'error': 'bad request: ' + str(e)})
+				return
+			if result == null:
+				self._reply(404, {'error': 'unknown route ' + route})
+			else:
+				self._reply(200, result)
+		def do_GET(self):
+			url = urlparse.urlparse(self.path)
+			args = dict(urlparse.parse_qsl(url.query))
+			self._handle(url.path, args)
+		def do_POST(self):
+			url = urlparse.urlparse(self.path)
+			length = int(self.headers.getheader('Content-Length', 0))
+			try:
+				args = json.loads(self.rfile.read(length))
+			except ValueError:
+				self._reply(400, {'error': 'body must be a JSON object'})
+				return
+			self._handle(url.path, args)
+		def log_message(self, format, *args):
+			#unix socket clients have no address to log, and per-request logging would dominate the query time
+			pass
+
+	if socket_path != null:
+		class QueryServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+			daemon_threads = True
+		return QueryServer(socket_path, QueryHandler)
+	class QueryServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+		daemon_threads = True
+	return QueryServer((host, port), QueryHandler)
+
+
+#the steps a job of main() runs when it names none, in the order the DataParser docstring gives
+JOB_STEPS = ['exonToIntron', 'intronExtender', 'mainParser']
+_JOB_FILES = ['ef', 'hcf', 'mcf', 'mclf', 'hrsinef', 'mrb1b2f']
+_JOB_PARAMETERS = {'extend_sine': 2000, 'extend_circRNA': 50, 'extend_intron': 10, 'comp_distance_buffer_high': 50, 'comp_distance_buffer_low': -50}
+
+
+def _runJob(job, base):
+	''' Runs one job of main(): builds its DataParser and calls each of its steps in its directory.  File names in the job are taken relative to base, and file names in the arguments of a step relative to the job directory. '''
+	files = dict([(key, os.path.join(base, job[key]) if job.get(key) != null else null) for key in _JOB_FILES])
+	parameters = dict(_JOB_PARAMETERS)
+	for key in parameters:
+		if job.get(key) != null:
+			parameters[key] = int(job[key])
+	parser = DataParser(files['ef'], files['hcf'], files['mcf'], files['mclf'], files['hrsinef'], files['mrb1b2f'], parameters['extend_sine'], parameters['extend_circRNA'], parameters['extend_intron'], parameters['comp_distance_buffer_high'], parameters['comp_distance_buffer_low'])
+	directory = os.path.join(base, job.get('directory', '.'))
+	if not os.path.isdir(directory):
+		os.makedirs(directory)
+	cwd = os.getcwd()
+	os.chdir(directory)
+	try:
+		for step in job.get('steps', JOB_STEPS):
+			if step.startswith('_') or not callable(getattr(DataParser, step, null)):
+				raise ValueError('unknown step ' + step)
+			arguments = dict([(str(key), value) for key, value in job.get(step, {}).items()])
+			#the first arguments of these three are positional
+			if step == 'exonToIntron':
+				parser.exonToIntron(arguments.pop('ef2', null), **arguments)
+			elif step == 'intronExtender':
+				parser.intronExtender(arguments.pop('inf2', null), **arguments)
+			elif step == 'mainParser':
+				parser.mainParser(arguments.pop('feiom', null), null, null, null, null, null, **arguments)
+			else:
+				getattr(parser, step)(**arguments)
+	finally:
+		os.chdir(cwd)
+		_resetSymbols()
+
+
+def _jobsOf(filename):
+	''' Reads a job file: a JSON list of jobs, or an object with a list of "jobs" and "defaults" that every job starts from '''
+	with open(filename) as f:
+		data = json.load(f)
+	if isinstance(data, list):
+		data = {'jobs': data}
+	jobs = list()
+	for job in data.get('jobs', []):
+		merged = dict(data.get('defaults', {}))
+		merged.update(job)
+		jobs.append(merged)
+	return jobs
+
+
+def main(argv=None):
+	''' The command line entry point.  Runs every job of the job files given, one after another in this process, so the interpreter starts once and the input tables loaded for one job are reused by the next; bedtools is only imported once a step needs it.
+		A job is a JSON object with the six file names of DataParser (ef, hcf, mcf, mclf, hrsinef, mrb1b2f), any of its five parameters, an optional "directory" to run in (created if needed), an optional list of "steps" naming DataParser methods (default exonToIntron, intronExtender, mainParser), and for any step an object of its keyword arguments, for example "mainParser": {"workers": 4}.
+		A single job can also be given with the options instead of a job file.
+	
+	:param argv: the command line arguments (default sys.argv[1:])
+	:type argv: list
+	:returns: the exit status, 0 when every job ran
+	'''
+	import argparse
+	import time
+	global _TABLE_CACHE
+	parser = argparse.ArgumentParser(description='Finds the circRNAs of a genome of interest that are conserved in human and flanked by SINEs on both sides.')
+	parser.add_argument('jobfiles', nargs='*', help='JSON job files, each a list of jobs or an object with "defaults" and "jobs"')
+	for key in _JOB_FILES:
+		parser.add_argument('--' + key, help='the ' + key + ' file of a single job')
+	for key in sorted(_JOB_PARAMETERS):
+		parser.add_argument('--' + key, type=int, help='the ' + key + ' of a single job (default ' + repr(_JOB_PARAMETERS[key]) + ')')
+	parser.add_argument('--directory', help='the directory a single job runs in (default the current directory)')
+	parser.add_argument('--steps', help='comma separated DataParser methods a single job runs (default ' + ",".join(JOB_STEPS) + ')')
+	parser.add_argument('--keep-going', action='store_true', help='run the remaining jobs after a job fails')
+	args = parser.parse_args(argv)
+	jobs = list()
+	for filename in args.jobfiles:
+		base = os.path.dirname(os.path.abspath(filename))
+		jobs.extend([(filename + ' job ' + repr(i + 1), job, base) for i, job in enumerate(_jobsOf(filename))])
+	if args.hcf != null:
+		job = dict([(key, getattr(args, key)) for key in _JOB_FILES + sorted(_JOB_PARAMETERS) + ['directory'] if getattr(args, key) != null])
+		if args.steps != null:
+			job['steps'] = args.steps.split(',')
+		jobs.append(('command line job', job, os.getcwd()))
+	if not jobs:
+		parser.error('give a job file, or --hcf, --mcf, --mclf, --hrsinef and --mrb1b2f for a single job')
+	failed = 0
+	_TABLE_CACHE = dict()
+	try:
+		for name, job, base in jobs:
+			print "Running " + name
+			began = time.time()
+			try:
+				_runJob(job, base)
+			except Exception, e:
+				failed += 1
+				print >> sys.stderr, name + " failed: " + repr(e)
+				if not args.keep_going:
+					break
+				continue
+			print name + " finished in " + ("%.1f" % (time.time() - began)) + " s"
+	finally:
+		_TABLE_CACHE = null
+	return 1 if failed else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -4,9 +4,11 @@ from os import path
 
 here = path.abspath(path.dirname(__file__))
 
-# Get the long description from the relevant file
-with open(path.join(here, 'README'), encoding='utf-8') as f:
-    long_description = f.read()
+# Get the long description from the relevant file, if there is one
+long_description = ''
+if path.exists(path.join(here, 'README')):
+    with open(path.join(here, 'README'), encoding='utf-8') as f:
+        long_description = f.read()
 
 setup(
     name='HumanCircRNADataParser',
@@ -54,4 +56,12 @@ setup(
 
     packages=["hcrdp"],
 
+    # The package is imported as hcrdp, from the HCRDP directory
+    package_dir={'hcrdp': 'HCRDP'},
+
+    # The command line entry point, see hcrdp.main()
+    entry_points={
+        'console_scripts': ['hcrdp=hcrdp.hcrdp:main'],
+    },
+
 )
\ No newline at end of file
@@ -0,0 +1,209 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'HCRDP'))
+import hcrdp
+
+
+def _randomRows(rng, n, chroms=('chr1', 'chr2', 'chr3'), size=100000, longest=3000):
+	rows = list()
+	for i in range(n):
+		start = rng.randint(0, size)
+		rows.append((rng.choice(chroms), str(start), str(start + rng.randint(1, longest)), 'r' + str(i), '0', rng.choice('+-')))
+	return rows
+
+
+def _writeBed(path, rows):
+	f = open(path, 'w')
+	for row in rows:
+		f.write("\t".join(row) + "\n")
+	f.close()
+
+
+class IndexTest(unittest.TestCase):
+	''' The memory mapped indexes answer like an IntervalIndex over the same rows '''
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.rng = random.Random(7)
+		self.rows = _randomRows(self.rng, 3000)
+		self.bed = os.path.join(self.directory, 'repeats.bed')
+		_writeBed(self.bed, self.rows)
+		self.index = hcrdp.IntervalIndex(self.rows)
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+	def windows(self, n=2000):
+		for i in range(n):
+			start = self.rng.randint(-5000, 110000)
+			yield self.rng.choice(('chr1', 'chr2', 'chr3', 'chrX')), start, start + self.rng.randint(1, 5000)
+	def testCoverageIndexCount(self):
+		path = os.path.join(self.directory, 'coverage.idx')
+		hcrdp.buildCoverageIndex(self.bed, path)
+		coverage = hcrdp.CoverageIndex(path)
+		try:
+			for chrom, start, end in self.windows():
+				self.assertEqual(coverage.count(chrom, start, end), self.index.count(chrom, start, end))
+				self.assertEqual(coverage.flanked(chrom, start, end, 2000), self.index.anyOverlap(chrom, start - 2000, end) and self.index.anyOverlap(chrom, start, end + 2000))
+		finally:
+			coverage.close()
+	def testCoverageIndexResolution(self):
+		path = os.path.join(self.directory, 'coverage.idx')
+		hcrdp.buildCoverageIndex(self.bed, path, 100)
+		coverage = hcrdp.CoverageIndex(path)
+		try:
+			for chrom, start, end in self.windows():
+				self.assertEqual(coverage.count(chrom, start, end), self.index.count(chrom, start // 100 * 100, -(-end // 100) * 100))
+		finally:
+			coverage.close()
+	def testSharedIntervalIndex(self):
+		path = os.path.join(self.directory, 'shared.idx')
+		hcrdp.buildSharedIndex(self.bed, path)
+		shared = hcrdp.SharedIntervalIndex(path)
+		try:
+			for chrom, start, end in self.windows():
+				found = shared.overlapping(chrom, start, end)
+				self.assertEqual(sorted(found), sorted(self.index.overlapping(chrom, start, end)))
+				self.assertEqual([list(shared.rows[i]) for i in found], [list(self.rows[i]) for i in found])
+				self.assertEqual(shared.anyOverlap(chrom, start, end), self.index.anyOverlap(chrom, start, end))
+			self.assertEqual(shared.names.get('r7'), [7])
+			self.assertEqual(shared.names.get('missing'), None)
+		finally:
+			shared.close()
+
+
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+def _fixture(name):
+	return os.path.join(DATA, name)
+
+
+def _lines(path):
+	return sorted([line for line in open(path).read().splitlines() if line != ''])
+
+
+class ConservationIndexTest(unittest.TestCase):
+	''' The conserved pairs of a ConservationIndex are the ones mainParser writes to nlhm_final.bed '''
+	def setUp(self):
+		self.index = hcrdp.ConservationIndex(_fixture('hcf.bed'), _fixture('mcf.bed'), _fixture('mclf.bed'), _fixture('sine.bed'), _fixture('b1b2.bed'))
+	def testConserved(self):
+		self.assertEqual(self.index.conserved(), _lines(_fixture('nlhm_final.bed')))
+	def testQuery(self):
+		names = [line.split("\t")[3] for line in _lines(_fixture('hcf.bed'))]
+		pairs = list()
+		for result in self.index.batch(names).values():
+			for record in result['records']:
+				for partner in record['partners']:
+					if partner['conserved']:
+						pairs.append("\t".join([partner['chrom'], str(partner['start']), str(partner['end']), partner['name'], record['chrom'], str(record['start']), str(record['end']), record['name']]))
+		self.assertEqual(sorted(set(pairs)), _lines(_fixture('nlhm_final.bed')))
+
+
+
+def _hasBedtools():
+	try:
+		import pybedtools
+	except ImportError:
+		return False
+	return True
+
+
+def _bed12(chrom, start, end, name):
+	return [chrom, str(start), str(end), name, '0', '+', str(start), str(end), '0', '1', str(end - start) + ',', '0,']
+
+
+class IncrementalParserTest(unittest.TestCase):
+	''' incrementalParser() brought up to date after hcf and mclf change saves what a full run saves on the changed inputs '''
+	def setUp(self):
+		self.cwd = os.getcwd()
+		self.directory = tempfile.mkdtemp()
+		for name in ('hcf.bed', 'mcf.bed', 'mclf.bed', 'sine.bed', 'b1b2.bed', 'eif.bed'):
+			shutil.copy(_fixture(name), self.directory)
+		os.chdir(self.directory)
+	def tearDown(self):
+		os.chdir(self.cwd)
+		shutil.rmtree(self.directory)
+	def parser(self):
+		return hcrdp.DataParser(None, 'hcf.bed', 'mcf.bed', 'mclf.bed', 'sine.bed', 'b1b2.bed', 2000, 50, 10, 50, -50)
+	def expected(self):
+		if _hasBedtools():
+			os.mkdir('full')
+			os.chdir('full')
+			try:
+				parser = hcrdp.DataParser(None, '../hcf.bed', '../mcf.bed', '../mclf.bed', '../sine.bed', '../b1b2.bed', 2000, 50, 10, 50, -50)
+				parser.mainParser('../eif.bed', None, None, None, None, None)
+				return dict([(name, _lines(name)) for name in hcrdp.MAIN_PARSER_RESULTS])
+			finally:
+				os.chdir(self.directory)
+		p = {'extend_sine': 2000, 'extend_circRNA': 50, 'extend_intron': 10, 'comp_distance_buffer_high': 50, 'comp_distance_buffer_low': -50}
+		results = hcrdp._engineResults(hcrdp._readBed('hcf.bed'), hcrdp._readBed('mclf.bed'), hcrdp._readBed('mcf.bed'), hcrdp.IntervalIndex(hcrdp._readBed('sine.bed')), hcrdp.IntervalIndex(hcrdp._readBed('b1b2.bed')), hcrdp.IntervalIndex(hcrdp._readBed('eif.bed')), p)
+		return dict([(name, sorted([line for line in results[name] if line != ''])) for name in results])
+	def testUpdate(self):
+		self.parser().incrementalParser('eif.bed')
+		human = [line.split("\t") for line in open('hcf.bed').read().splitlines() if line != '']
+		lifted = [line.split("\t") for line in open('mclf.bed').read().splitlines() if line != '']
+		conserved = [line.split("\t") for line in _lines(_fixture('nlhm_final.bed'))]
+		#removed rows, a changed row and a new row
+		removed = set([conserved[0][7], conserved[1][7]])
+		human = [row for row in human if row[3] not in removed]
+		human[0][2] = str(int(human[0][2]) + 7)
+		human.append(_bed12('chr2', 500, 1500, 'hsa_new'))
+		lifted = [row for row in lifted if row[3] != conserved[2][3]]
+		lifted[0][1] = str(int(lifted[0][1]) - 20)
+		#a second lifted row named after a conserved circRNA of the genome of interest, lying on another human circRNA
+		other = [row for row in human if row[3] not in [x[7] for x in conserved]][0]
+		lifted.append(_bed12(other[0], int(other[1]), int(other[2]), conserved[3][3]))
+		_writeBed('hcf.bed', human)
+		_writeBed('mclf.bed', lifted)
+		counts = self.parser().incrementalParser('eif.bed')
+		self.assertTrue(counts['added'] > 0 and counts['removed'] > 0 and counts['changed'] > 0)
+		self.assertTrue(counts['kept'] > 0)
+		expected = self.expected()
+		for name in hcrdp.MAIN_PARSER_RESULTS:
+			self.assertEqual(_lines(name), expected[name], name)
+
+
+
+@unittest.skipUnless(_hasBedtools(), 'the legacy path of mainParser needs pybedtools')
+class EquivalenceTest(unittest.TestCase):
+	''' Every engine of equivalenceCheck() saves the rows of the legacy path on the fixture '''
+	def setUp(self):
+		self.cwd = os.getcwd()
+		self.directory = tempfile.mkdtemp()
+		os.chdir(self.directory)
+	def tearDown(self):
+		os.chdir(self.cwd)
+		shutil.rmtree(self.directory)
+	def testEquivalence(self):
+		parser = hcrdp.DataParser(None, _fixture('hcf.bed'), _fixture('mcf.bed'), _fixture('mclf.bed'), _fixture('sine.bed'), _fixture('b1b2.bed'), 2000, 50, 10, 50, -50)
+		report = parser.equivalenceCheck(_fixture('eif.bed'))
+		self.assertEqual(sorted(report), sorted(hcrdp.EQUIVALENCE_ENGINES))
+		for name in report:
+			self.assertTrue(report[name]['equivalent'], name)
+		self.assertEqual(_lines(os.path.join('equivalence', 'legacy', 'nlhm_final.bed')), _lines(_fixture('nlhm_final.bed')))
+
+
+class FlankEnrichmentTest(unittest.TestCase):
+	''' flankEnrichment() leaves out the circRNAs it cannot place '''
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.genome = os.path.join(self.directory, 'genome.txt')
+		_writeBed(self.genome, [('chr1', '1000000'), ('chr2', '1000000'), ('chr3', '1000000')])
+		self.circ = os.path.join(self.directory, 'circ.bed')
+		_writeBed(self.circ, [line.split("\t") for line in _lines(_fixture('hcf.bed'))] + [_bed12('chr1', 0, 2000000, 'long'), _bed12('chrZ', 5, 50, 'missing')])
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+	def testSkipped(self):
+		result = hcrdp.flankEnrichment(self.circ, _fixture('sine.bed'), self.genome, permutations=20, processes=2)
+		self.assertEqual(result['skipped'], 2)
+		self.assertEqual(result['total'], len(_lines(_fixture('hcf.bed'))))
+		self.assertEqual(len(result['counts']), 20)
+		self.assertEqual(result, hcrdp.flankEnrichment(self.circ, _fixture('sine.bed'), self.genome, permutations=20))
+
+
+if __name__ == '__main__':
+	unittest.main()